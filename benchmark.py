@@ -0,0 +1,264 @@
+"""Benchmarks for building, evaluating and validating HTML and for bundling and loading exercises.
+
+The benchmarks run in plain CPython, where the HTML helpers build `VNode`s instead of DOM elements. Every benchmark is
+run over a range of sizes (number of elements, nesting depth, number of wildcards or number of exercises) built by the
+synthetic generators below, so the results show how each step scales and not just how fast it is for one input.
+
+Usage:
+    python benchmark.py [--output results.json] [--baseline baseline.json] [--threshold 1.25] [--quick]
+
+With `--baseline`, every result is compared to the stored one and the script exits with status 1 if any benchmark got
+slower than the threshold allows.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Final
+
+import html_helpers
+from bundle_exercises import bundle_files
+from exercises import ExerciseCatalog
+from html_helpers import _virtual_nodes, div, li, p, span, ul
+from solution_validator import AnswerTemplate, validate_solution
+from user_code import evaluate_user_code
+from virtual_dom import VNode
+
+# How many times each benchmark is repeated. The reported time is the minimum (and median) over these runs.
+REPEATS: Final[int] = 5
+QUICK_REPEATS: Final[int] = 2
+
+DEFAULT_THRESHOLD: Final[float] = 1.25
+
+type Benchmark = tuple[str, Callable[[], object]]
+type Results = dict[str, dict[str, float | int]]
+
+
+# Synthetic inputs
+
+
+def wide_tree(size: int) -> VNode:
+    """Create a list with `size` items, each containing some text and a nested element."""
+    with _virtual_nodes():
+        return div(ul(*[li(f"Item {index} ", span(str(index))) for index in range(size)]))
+
+
+def wide_template(size: int) -> str:
+    """Create the answer template matching `wide_tree(size)`."""
+    return "<ul>" + "<li>Item {{*}} <span>{{*}}</span></li>" * size + "</ul>"
+
+
+def deep_tree(depth: int) -> VNode:
+    """Create `depth` nested <div>s with a paragraph at the bottom."""
+    with _virtual_nodes():
+        node = p("Hello World!")
+        for _ in range(depth):
+            node = div(node)
+        return div(node)
+
+
+def deep_template(depth: int) -> str:
+    """Create the answer template matching `deep_tree(depth)`."""
+    return "<div>" * depth + "<p>Hello {{*}}!</p>" + "</div>" * depth
+
+
+def wildcard_text(wildcards: int) -> tuple[str, str]:
+    """Create a template with `wildcards` wildcards in a single text node and a long text matching it."""
+    template = "<p>" + "{{*}}, " * wildcards + "{{*}}</p>"
+    text = ", ".join(["lorem ipsum dolor sit amet"] * (wildcards + 1) * 4)
+    return template, text
+
+
+def wide_source(size: int) -> str:
+    """Create user code with `size` top-level expressions."""
+    return "\n".join(f'p("Paragraph {index}", id="p{index}")' for index in range(size))
+
+
+def deep_source(depth: int) -> str:
+    """Create user code that builds `depth` nested elements with a recursive helper function."""
+    return f"""
+def nest(depth):
+    if depth == 0:
+        return p("Hello World!")
+    return div(nest(depth - 1))
+nest({depth})
+"""
+
+
+def exercises_catalog(exercise_count: int, exercises_per_group: int = 10) -> dict:
+    """Create an exercises JSON document with `exercise_count` exercises."""
+    exercise = {
+        "title": "Exercise",
+        "explanation": "The <p> element is used to define a paragraph. " * 4,
+        "example": "<p>This is how to use a tag.</p>",
+        "description": "Create a paragraph containing whatever you want!",
+        "answer": "<p>{{*}}<em>HTML</em>{{*}}</p>",
+        "errorHints": [{"afterTries": tries, "message": "Make sure to use the correct tag."} for tries in (3, 4, 5)],
+    }
+    groups = []
+    for group_start in range(0, exercise_count, exercises_per_group):
+        exercises = [
+            exercise | {"title": f"Exercise {index}"}
+            for index in range(group_start, min(group_start + exercises_per_group, exercise_count))
+        ]
+        groups.append({"title": f"Group {group_start}", "description": "A group.", "exercises": exercises})
+    return {"exerciseGroups": groups}
+
+
+# Benchmarks
+
+
+def _tag_benchmarks(*, quick: bool) -> Iterator[Benchmark]:
+    for size in (10, 100) if quick else (10, 100, 1000, 10000):
+        yield f"tag.wide[size={size}]", lambda size=size: wide_tree(size)
+    for depth in (10, 100) if quick else (10, 100, 500):
+        yield f"tag.deep[depth={depth}]", lambda depth=depth: deep_tree(depth)
+    tree = wide_tree(100 if quick else 1000)
+    yield f"render.wide[size={len(tree.children[0].children)}]", lambda: tree.outerHTML
+    yield "tag.single", _single_element
+
+
+def _single_element() -> VNode:
+    with _virtual_nodes():
+        return p("Some text ", html_helpers.em("HTML"), id="paragraph", style="color: red;")
+
+
+def _evaluate_benchmarks(*, quick: bool) -> Iterator[Benchmark]:
+    for size in (10, 100) if quick else (10, 100, 1000):
+        source = wide_source(size)
+        yield f"evaluate.wide[size={size}]", lambda source=source: evaluate_user_code(source)
+    for depth in (10, 100) if quick else (10, 100, 250):
+        source = deep_source(depth)
+        yield f"evaluate.deep[depth={depth}]", lambda source=source: evaluate_user_code(source)
+
+
+def _validate_benchmarks(*, quick: bool) -> Iterator[Benchmark]:
+    for size in (10, 100) if quick else (10, 100, 1000, 10000):
+        tree, template = wide_tree(size), wide_template(size)
+        yield f"validate.wide[size={size}]", lambda tree=tree, template=template: validate_solution(template, tree)
+    for size in (10, 100) if quick else (10, 100, 1000):
+        template = wide_template(size)
+        yield f"template.compile[size={size}]", lambda template=template: AnswerTemplate(template)
+    for depth in (10, 100) if quick else (10, 100, 250):
+        tree, template = deep_tree(depth), deep_template(depth)
+        yield f"validate.deep[depth={depth}]", lambda tree=tree, template=template: validate_solution(template, tree)
+    for wildcards in (1, 10) if quick else (1, 10, 50):
+        template, text = wildcard_text(wildcards)
+        with _virtual_nodes():
+            tree = div(p(text))
+        yield (
+            f"validate.wildcards[count={wildcards}]",
+            lambda tree=tree, template=template: validate_solution(template, tree),
+        )
+
+
+def _bundle_benchmarks(directory: Path, *, quick: bool) -> Iterator[Benchmark]:
+    for exercise_count in (40, 400) if quick else (40, 400, 4000):
+        json_file = directory / f"exercises-{exercise_count}.json"
+        json_file.write_text(json.dumps(exercises_catalog(exercise_count)))
+        yield f"bundle.build[count={exercise_count}]", lambda json_file=json_file: bundle_files(json_file)
+        files = bundle_files(json_file)
+        yield f"catalog.index[count={exercise_count}]", lambda files=files: _load_catalog(files)
+    for group_size in (10, 100) if quick else (10, 100, 1000):
+        json_file = directory / f"exercise-group-{group_size}.json"
+        json_file.write_text(json.dumps(exercises_catalog(group_size, exercises_per_group=group_size)))
+        files = bundle_files(json_file)
+        yield f"catalog.group[size={group_size}]", lambda files=files: _load_catalog(files, group_index=0)
+
+
+def _load_catalog(files: dict[str, str], group_index: int | None = None) -> ExerciseCatalog:
+    """Load a catalog from bundle files in memory, like the page does, but without an event loop."""
+
+    async def read_file(name: str) -> str:
+        return files[name]
+
+    catalog = ExerciseCatalog(read_file)
+    # Reading the files never has to wait, so the coroutine finishes the first time it's resumed
+    try:
+        catalog.load(group_index).send(None)
+    except StopIteration:
+        return catalog
+    msg = "Loading the catalog didn't finish without waiting"
+    raise RuntimeError(msg)
+
+
+def run_benchmark(function: Callable[[], object], repeats: int) -> dict[str, float | int]:
+    """Time a function, returning the minimum and median time per call in seconds."""
+    timer = timeit.Timer(function)
+    loops, _ = timer.autorange()
+    times = [time / loops for time in timer.repeat(repeat=repeats, number=loops)]
+    return {"min": min(times), "median": statistics.median(times), "loops": loops, "repeats": repeats}
+
+
+def run_benchmarks(*, quick: bool = False, name_filter: str = "") -> Results:
+    """Run all benchmarks whose name contains `name_filter`, printing the results as they come in."""
+    results: Results = {}
+    repeats = QUICK_REPEATS if quick else REPEATS
+    with tempfile.TemporaryDirectory() as directory:
+        benchmarks = (
+            *_tag_benchmarks(quick=quick),
+            *_evaluate_benchmarks(quick=quick),
+            *_validate_benchmarks(quick=quick),
+            *_bundle_benchmarks(Path(directory), quick=quick),
+        )
+        for name, function in benchmarks:
+            if name_filter not in name:
+                continue
+            results[name] = run_benchmark(function, repeats)
+            print(f"{name:<40} {results[name]['min'] * 1e6:>14.1f} µs", file=sys.stderr)
+    return results
+
+
+def compare(results: Results, baseline: Results, threshold: float) -> list[str]:
+    """Compare results against a baseline, returning the names of the benchmarks that got too much slower."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["min"] / baseline[name]["min"]
+        marker = ""
+        if ratio > threshold:
+            regressions.append(name)
+            marker = "  REGRESSION"
+        print(f"{name:<40} {ratio:>8.2f}x{marker}", file=sys.stderr)
+    return regressions
+
+
+def main() -> None:
+    """Run the benchmark CLI."""
+    parser = argparse.ArgumentParser(description="Benchmark the evaluate/validate hot path.")
+    parser.add_argument("--output", "-o", type=Path, help="write the results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, help="compare the results to a JSON file written by --output")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"slowdown factor that counts as a regression (default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument("--quick", action="store_true", help="only run the smaller sizes with fewer repeats")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this string")
+    args = parser.parse_args()
+
+    results = run_benchmarks(quick=args.quick, name_filter=args.filter)
+    if args.output is not None:
+        report = {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Build the precompiled exercise bundle from `exercises.json`.
+
+The bundle consists of a small index with the titles of all groups and exercises plus one file per group containing
+the group's exercises, including their pre-parsed answer templates. The page only loads the index up front and the
+group files as they're needed. Rerun this after changing `exercises.json`, or use `--check` to only find out whether
+the bundle is out of date.
+
+Usage:
+    python bundle_exercises.py [exercises.json] [--output bundle] [--check]
+"""
+
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+from typing import Final
+from xml.etree import ElementTree as ET
+
+from exercises import BUNDLE_INDEX_FILE, bundle_shard_file
+from solution_validator import AnswerTemplate
+
+DEFAULT_EXERCISES_JSON_FILE: Final[Path] = Path(__file__).parent / "exercises.json"
+DEFAULT_BUNDLE_DIRECTORY: Final[Path] = Path(__file__).parent / "bundle"
+
+
+def _to_json(contents: dict) -> str:
+    return json.dumps(contents, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _with_answer_tree(exercise: dict) -> dict:
+    """Add the pre-parsed answer template to an exercise, unless the template can't be parsed."""
+    try:
+        return exercise | {"answerTree": AnswerTemplate(exercise["answer"]).to_data()}
+    except ET.ParseError as err:
+        print(f"Warning: Can't parse the answer of exercise {exercise['title']!r}: {err}", file=sys.stderr)
+        return exercise
+
+
+def bundle_files(json_file: Path) -> dict[str, str]:
+    """Create the files of the bundle for the given exercises JSON file, by file name."""
+    with json_file.open(encoding="utf-8") as f:
+        contents = json.load(f)
+
+    files = {}
+    index_groups = []
+    for group_index, exercise_group in enumerate(contents["exerciseGroups"]):
+        exercises = [_with_answer_tree(exercise) for exercise in exercise_group["exercises"]]
+        files[bundle_shard_file(group_index)] = _to_json({"exercises": exercises})
+        index_groups.append(
+            {
+                "title": exercise_group["title"],
+                "description": exercise_group["description"],
+                "exercises": [exercise["title"] for exercise in exercise_group["exercises"]],
+            },
+        )
+    files[BUNDLE_INDEX_FILE] = _to_json({"exerciseGroups": index_groups})
+    return files
+
+
+def build_bundle(json_file: Path, output_directory: Path) -> None:
+    """Build the bundle for the given exercises JSON file, replacing any previous bundle in the output directory."""
+    files = bundle_files(json_file)
+    if output_directory.exists():
+        shutil.rmtree(output_directory)
+    output_directory.mkdir(parents=True)
+    for name, contents in files.items():
+        (output_directory / name).write_text(contents, encoding="utf-8")
+
+
+def is_up_to_date(json_file: Path, output_directory: Path) -> bool:
+    """Whether the output directory contains exactly the bundle for the given exercises JSON file."""
+    if not output_directory.is_dir():
+        return False
+    existing_files = {path.name: path.read_text(encoding="utf-8") for path in output_directory.iterdir()}
+    return existing_files == bundle_files(json_file)
+
+
+def main() -> None:
+    """Run the bundle build, or with --check, only report whether the bundle is up to date."""
+    parser = argparse.ArgumentParser(description="Build the precompiled exercise bundle.")
+    parser.add_argument("exercises", type=Path, nargs="?", default=DEFAULT_EXERCISES_JSON_FILE)
+    parser.add_argument("--output", "-o", type=Path, default=DEFAULT_BUNDLE_DIRECTORY)
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if the bundle is out of date")
+    args = parser.parse_args()
+    if not args.check:
+        build_bundle(args.exercises, args.output)
+    elif not is_up_to_date(args.exercises, args.output):
+        print(f"Out of date, run bundle_exercises.py: {args.output}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Choosing where the user's code runs.
+
+By default, user code runs on the main thread, which is fast but means that an endless loop freezes the whole page.
+Pages can instead opt into running it in a PyScript worker by adding `<meta name="execution-mode" content="worker">`.
+The worker is given a time limit and a limit on the size of the output and can be stopped and replaced at any time
+without reloading the page. With `content="micropython-worker"`, the worker runs MicroPython instead of Pyodide, which
+starts in a fraction of the time, so the first run and every restart after stopping the code are much faster. This
+doesn't change how long the page takes to start, which always runs on Pyodide. The user's code is evaluated by the
+same `user_code` module in both. Note that workers need the page to be served with
+cross-origin isolation headers (`Cross-Origin-Opener-Policy: same-origin` and `Cross-Origin-Embedder-Policy:
+require-corp`).
+"""
+
+import asyncio
+import json
+from collections.abc import Awaitable, Callable
+from typing import Final
+
+from pyscript import PyWorker, document
+from submission_timing import stage
+from user_code import compile_user_code, run_user_code
+from virtual_dom import VNode, from_data
+
+WORKER_SCRIPT: Final[str] = "./code_runner_worker.py"
+WORKER_CONFIG: Final[str] = "./worker.json"
+# The interpreter running the worker, by execution mode
+WORKER_INTERPRETERS: Final[dict[str, str]] = {"worker": "pyodide", "micropython-worker": "micropython"}
+
+# How long user code may run in the worker before it's stopped
+TIMEOUT_SECONDS: Final[float] = 5.0
+
+# The maximum size of the generated output, in characters of its JSON representation
+MAX_OUTPUT_SIZE: Final[int] = 1_000_000
+
+type CodeRunner = Callable[[str], Awaitable[VNode]]
+
+
+class UserCodeError(Exception):
+    """The user's code could not be run to completion in the worker."""
+
+
+async def run_in_main_thread(source: str) -> VNode:
+    """Run the user's code directly on the main thread."""
+    with stage("compile"):
+        code = compile_user_code(source)
+    with stage("exec"):
+        return run_user_code(code)
+
+
+class WorkerCodeRunner:
+    """Runs user code in a PyScript worker, using the given interpreter ("pyodide" or "micropython").
+
+    The runner is shared by submissions and the live preview. Runs happen one at a time, so the time limit only counts
+    a run's own time, and restarting the worker only stops the run in progress. Runs waiting for their turn are sent
+    to the new worker.
+    """
+
+    __slots__ = ("_interpreter", "_lock", "_pending", "_worker")
+
+    def __init__(self, interpreter: str = "pyodide") -> None:
+        self._interpreter = interpreter
+        self._lock = asyncio.Lock()
+        self._pending: set[asyncio.Task] = set()
+        self._worker = self._start_worker()
+
+    def _start_worker(self) -> PyWorker:
+        return PyWorker(WORKER_SCRIPT, type=self._interpreter, config=WORKER_CONFIG)
+
+    @property
+    def busy(self) -> bool:
+        """Whether any code is currently running (or waiting to run) in the worker."""
+        return bool(self._pending) or self._lock.locked()
+
+    async def __call__(self, source: str) -> VNode:
+        """Run the user's code in the worker, raising `UserCodeError` if it fails, times out or is stopped."""
+        async with self._lock:
+            await self._worker.ready
+            task = asyncio.ensure_future(self._run(self._worker, source))
+            self._pending.add(task)
+            try:
+                result = json.loads(await asyncio.wait_for(task, TIMEOUT_SECONDS))
+            except TimeoutError as err:
+                self.restart()
+                msg = f"The code took longer than {TIMEOUT_SECONDS:g} seconds to run and was stopped"
+                raise UserCodeError(msg) from err
+            except asyncio.CancelledError as err:
+                msg = "The code was stopped"
+                raise UserCodeError(msg) from err
+            finally:
+                self._pending.discard(task)
+        if "error" in result:
+            raise UserCodeError(result["error"])
+        return from_data(result["output"])
+
+    @staticmethod
+    async def _run(worker: PyWorker, source: str) -> str:
+        return await worker.sync.run(source, MAX_OUTPUT_SIZE)
+
+    def restart(self) -> None:
+        """Stop the code running in the worker by replacing the worker with a fresh one."""
+        for task in self._pending:
+            task.cancel()
+        self._pending.clear()
+        self._worker.terminate()
+        self._worker = self._start_worker()
+
+
+def create_code_runner() -> CodeRunner:
+    """Create the code runner selected by the page's execution-mode meta tag."""
+    execution_mode = document.querySelector("meta[name='execution-mode']")
+    if execution_mode is not None and execution_mode.content in WORKER_INTERPRETERS:
+        return WorkerCodeRunner(WORKER_INTERPRETERS[execution_mode.content])
+    return run_in_main_thread
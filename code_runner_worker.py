@@ -0,0 +1,26 @@
+"""The script running in the PyScript worker that evaluates user code, see `code_runner`.
+
+The output is sent back to the main thread as JSON, in the representation created by `virtual_dom.to_data`.
+"""
+
+import json
+
+from pyscript import sync
+from user_code import evaluate_user_code
+from virtual_dom import to_data
+
+
+def run(source: str, max_output_size: int) -> str:
+    """Run the user's code, returning either `{"output": ...}` or `{"error": "..."}` as JSON."""
+    try:
+        output = json.dumps(to_data(evaluate_user_code(source)))
+    except Exception as err:
+        return json.dumps({"error": str(err)})
+    if len(output) > max_output_size:
+        return json.dumps(
+            {"error": f"The output is too large ({len(output)} characters, at most {max_output_size} are allowed)"},
+        )
+    return f'{{"output": {output}}}'
+
+
+sync.run = run
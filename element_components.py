@@ -1,19 +1,24 @@
-from html_helpers import _tag, a, button, div, img, nav, span
-from pyscript.web import Element
+from html_helpers import Element, _tag, a, button, div, img, nav, span
+from router import EXERCISES_PAGE_NAME, SHELL_PAGE_NAME, route_href
 
 
-def custom_nav() -> Element:
-    """Create a custom navigation element."""
+def custom_nav(base_url: str = "") -> Element:
+    """Create a custom navigation element.
+
+    The links point to the views of the shell page. Inside the shell, the base URL is empty, so following them doesn't
+    leave the page. Other pages pass the shell's URL.
+    """
     a_style = "color: white; text-decoration: none; margin-right: 1em;"
     a_onmouseover = "this.style.textDecoration = 'underline';"
     a_onmouseleave = "this.style.textDecoration = 'none';"
+    home_href = base_url + route_href(SHELL_PAGE_NAME)
     return nav(
         div(
-            a(img(src="./assets/icon.png", alt="Logo", style="width: 3em"), href="./"),
-            a("Home", href="./", style=a_style, onmouseover=a_onmouseover, onmouseleave=a_onmouseleave),
+            a(img(src="./assets/icon.png", alt="Logo", style="width: 3em"), href=home_href),
+            a("Home", href=home_href, style=a_style, onmouseover=a_onmouseover, onmouseleave=a_onmouseleave),
             a(
                 "Exercises",
-                href="./exercises.html",
+                href=base_url + route_href(EXERCISES_PAGE_NAME),
                 style=a_style,
                 onmouseover=a_onmouseover,
                 onmouseleave=a_onmouseleave,
@@ -25,10 +30,10 @@ def custom_nav() -> Element:
     )
 
 
-def custom_button(text: str) -> Element:
+def custom_button(text: str, **attributes: str) -> Element:
     """Create a custom button element."""
     button_style = "background-color: #4CAF50; color: white; border: none; padding: 0.5em 1em; cursor: pointer;"
-    return button(text, style=button_style)
+    return button(text, style=button_style, **attributes)
 
 
 def custom_code_block(text: str, *children: str | Element, **attributes: str) -> Element:
@@ -1,8 +1,13 @@
-"""A module that loads HTML exercises from a JSON file."""
+"""A module that loads HTML exercises from a JSON file or from a precompiled bundle."""
 
 import json
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Final
+
+# The file in an exercise bundle that lists the groups and the titles of their exercises
+BUNDLE_INDEX_FILE: Final[str] = "index.json"
 
 
 @dataclass(frozen=True)
@@ -37,6 +42,8 @@ class Exercise:
         answer (str) The correct answer to the exercise to check the user's
             solution against
         errorHints (list[ErrorHint]) A list of hints for the exercise
+        answer_tree (list | None) The pre-parsed answer template, if the
+            exercise was loaded from a bundle
 
     """
 
@@ -46,6 +53,7 @@ class Exercise:
     description: str
     answer: str
     error_hints: list[ErrorHint]
+    answer_tree: list | None = None
 
 
 @dataclass(frozen=True)
@@ -127,6 +135,7 @@ def _load_exercise(exercise_obj: dict[str, str | list | dict]) -> Exercise:
         description=exercise_obj["description"],
         answer=exercise_obj["answer"],
         error_hints=_load_hints(exercise_obj["errorHints"]),
+        answer_tree=exercise_obj.get("answerTree"),
     )
 
 
@@ -158,3 +167,75 @@ def load_exercises_from_json(json_file: Path) -> list[ExerciseGroup]:
         )
 
     return exercise_groups
+
+
+def bundle_shard_file(group_index: int) -> str:
+    """Get the name of the file in an exercise bundle that contains the exercises of the given group."""
+    return f"group-{group_index}.json"
+
+
+@dataclass(frozen=True)
+class ExerciseGroupSummary:
+    """A dataclass that represents an exercise group whose exercises haven't been loaded yet.
+
+    Attributes
+    ----------
+        title (str) The title of the exercise group
+        description (str) Long description of the exercise group detailing what it covers
+        exercise_titles (list[str]) The titles of the exercises in the group
+
+    """
+
+    title: str
+    description: str
+    exercise_titles: list[str]
+
+
+class ExerciseCatalog:
+    """The exercises from a bundle created by `bundle_exercises.py`, loaded as they're needed.
+
+    Nothing is read until `load` is first called. Then only the bundle's index with the titles is loaded, and the full
+    contents of a group are loaded the first time `load` is called for it. The files are read asynchronously, so
+    loading them doesn't block the page. The other methods only return what has been loaded already.
+    """
+
+    def __init__(self, read_file: Callable[[str], Awaitable[str]]) -> None:
+        """Create a catalog that reads the bundle's files with the given async function, which takes a file name."""
+        self._read_file = read_file
+        self._groups: list[ExerciseGroupSummary] | None = None
+        self._loaded_groups: dict[int, ExerciseGroup] = {}
+
+    async def load(self, group_index: int | None = None) -> None:
+        """Load the index and, if given, the exercises of a group, unless they're already loaded."""
+        if self._groups is None:
+            index = json.loads(await self._read_file(BUNDLE_INDEX_FILE))
+            self._groups = [
+                ExerciseGroupSummary(group["title"], group["description"], group["exercises"])
+                for group in index["exerciseGroups"]
+            ]
+        if group_index is None or group_index in self._loaded_groups:
+            return
+        shard = json.loads(await self._read_file(bundle_shard_file(group_index)))
+        exercises = [_load_exercise(exercise) for exercise in shard["exercises"]]
+        summary = self._groups[group_index]
+        self._loaded_groups[group_index] = ExerciseGroup(summary.title, summary.description, exercises)
+
+    @property
+    def groups(self) -> list[ExerciseGroupSummary]:
+        """Get the titles of all groups and their exercises. The index has to be loaded first."""
+        if self._groups is None:
+            msg = "The index of the exercise bundle hasn't been loaded"
+            raise RuntimeError(msg)
+        return self._groups
+
+    def group(self, group_index: int) -> ExerciseGroup:
+        """Get the group with the given index, whose exercises have to be loaded first."""
+        group = self._loaded_groups.get(group_index)
+        if group is None:
+            msg = f"The exercises of group {group_index} haven't been loaded"
+            raise RuntimeError(msg)
+        return group
+
+    def exercise(self, group_index: int, exercise_index: int) -> Exercise:
+        """Get the exercise with the given indices, whose group has to be loaded first."""
+        return self.group(group_index).exercises[exercise_index]
@@ -0,0 +1,200 @@
+"""Grade stored submissions against the exercises outside of the browser.
+
+Each line of the input is a JSON object with the title of the exercise (`exercise`), the submitted code (`source`) and
+optionally an `id`. For every submission, a JSON line with the verdict is written to the output in the same order:
+`pass` or `fail` together with the validation message, or `error` if the code couldn't be run, took longer than the
+time limit or the exercise's answer template can't be parsed.
+
+Usage:
+    python grading.py submissions.jsonl [--output verdicts.jsonl] [--exercises exercises.json] [--workers 4]
+                     [--timeout 5]
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Final, TextIO
+from xml.etree import ElementTree as ET
+
+from exercises import Exercise, load_exercises_from_json
+from solution_validator import compile_template, validate_solution
+from user_code import evaluate_user_code
+
+DEFAULT_EXERCISES_JSON_FILE: Final[Path] = Path(__file__).parent / "exercises.json"
+
+# How many submissions are handed to the worker processes at once. Bounding this keeps memory usage flat no matter how
+# large the input is, while still giving every worker enough to do.
+BATCH_SIZE_PER_WORKER: Final[int] = 64
+
+# How long the code of a single submission may run before it's stopped
+DEFAULT_TIMEOUT_SECONDS: Final[float] = 5.0
+
+type Verdict = dict[str, str | int | None]
+
+
+class _WorkerState:
+    """The exercises known to a worker process, by title, and the time limit for running submissions.
+
+    The answer templates are compiled when the worker starts. Exercises whose template can't be parsed are kept in
+    `template_errors` with the parser's message, so their submissions get an `error` verdict.
+    """
+
+    exercises: dict[str, Exercise] = {}  # noqa: RUF012
+    template_errors: dict[str, str] = {}  # noqa: RUF012
+    timeout: float = DEFAULT_TIMEOUT_SECONDS
+
+
+class _TimeoutExpired(BaseException):
+    """Raised in the submitted code when it runs out of time.
+
+    Not an `Exception`, so that the code can't accidentally swallow it with `except Exception`.
+    """
+
+
+def _init_worker(exercises_json_file: Path, timeout: float = DEFAULT_TIMEOUT_SECONDS) -> None:
+    _WorkerState.exercises = {
+        exercise.title: exercise
+        for exercise_group in load_exercises_from_json(exercises_json_file)
+        for exercise in exercise_group.exercises
+    }
+    _WorkerState.template_errors = {}
+    for exercise in _WorkerState.exercises.values():
+        try:
+            compile_template(exercise.answer)
+        except ET.ParseError as err:
+            _WorkerState.template_errors[exercise.title] = str(err)
+    _WorkerState.timeout = timeout
+
+
+def _raise_timeout_expired(_signal_number: int, _frame: object) -> None:
+    raise _TimeoutExpired
+
+
+@contextmanager
+def _time_limit(seconds: float) -> Iterator[None]:
+    """Raise `_TimeoutExpired` inside the `with` block once it has run for the given number of seconds.
+
+    The timer signal interrupts Python code, like an endless loop, but not a single long-running operation in C, like
+    computing a huge power. On Windows, which has no such timer, there's no limit.
+    """
+    if not hasattr(signal, "setitimer"):
+        yield
+        return
+    previous_handler = signal.signal(signal.SIGALRM, _raise_timeout_expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def grade_submission(line_number: int, line: str) -> Verdict:
+    """Grade a single submission, given as a line of JSON."""
+    verdict: Verdict = {"line": line_number, "id": None, "exercise": None}
+    try:
+        submission = json.loads(line)
+        verdict["id"] = submission.get("id")
+        verdict["exercise"] = submission["exercise"]
+        source = submission["source"]
+    except (ValueError, KeyError, AttributeError) as err:
+        return verdict | {"verdict": "error", "message": f"Invalid submission: {err!s}"}
+
+    exercise = _WorkerState.exercises.get(verdict["exercise"])
+    if exercise is None:
+        return verdict | {"verdict": "error", "message": "Unknown exercise"}
+    template_error = _WorkerState.template_errors.get(exercise.title)
+    if template_error is not None:
+        return verdict | {"verdict": "error", "message": f"The answer template can't be parsed: {template_error}"}
+
+    try:
+        with _time_limit(_WorkerState.timeout):
+            output = evaluate_user_code(source)
+    except _TimeoutExpired:
+        message = f"The code took longer than {_WorkerState.timeout:g} seconds to run and was stopped"
+        return verdict | {"verdict": "error", "message": message}
+    except Exception as err:
+        message = f"The code did not produce valid HTML element. Error: {err!s}"
+        return verdict | {"verdict": "error", "message": message}
+
+    correct_solution, msg = validate_solution(exercise.answer, output)
+    return verdict | {"verdict": "pass" if correct_solution else "fail", "message": msg.textContent}
+
+
+def _batches(lines: Iterable[str], size: int) -> Iterator[list[tuple[int, str]]]:
+    numbered_lines = ((line_number, line) for line_number, line in enumerate(lines, start=1) if line.strip())
+    while batch := list(islice(numbered_lines, size)):
+        yield batch
+
+
+def grade_submissions(
+    submissions: Iterable[str],
+    output: TextIO,
+    exercises_json_file: Path = DEFAULT_EXERCISES_JSON_FILE,
+    workers: int | None = None,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+) -> Counter[str]:
+    """Grade submissions in a pool of worker processes, streaming the verdicts to `output` in input order.
+
+    The code of each submission may run for `timeout` seconds. Returns the number of submissions per verdict.
+    """
+    counts: Counter[str] = Counter()
+    workers = workers or os.cpu_count() or 1
+    initargs = (exercises_json_file, timeout)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as executor:
+        for batch in _batches(submissions, BATCH_SIZE_PER_WORKER * workers):
+            line_numbers, lines = zip(*batch, strict=True)
+            for verdict in executor.map(grade_submission, line_numbers, lines, chunksize=BATCH_SIZE_PER_WORKER // 4):
+                counts[verdict["verdict"]] += 1
+                output.write(json.dumps(verdict, ensure_ascii=False) + "\n")
+    return counts
+
+
+def _print_stats(counts: Counter[str], wall_time: float) -> None:
+    total = counts.total()
+    throughput = total / wall_time if wall_time > 0 else 0.0
+    print(
+        f"Graded {total} submissions in {wall_time:.2f}s ({throughput:.1f} submissions/s): "
+        f"{counts['pass']} passed, {counts['fail']} failed, {counts['error']} errors",
+        file=sys.stderr,
+    )
+
+
+def main() -> None:
+    """Run the grading CLI."""
+    parser = argparse.ArgumentParser(description="Grade stored submissions against the exercises.")
+    parser.add_argument("submissions", type=Path, help="JSONL file with one submission per line, - for stdin")
+    parser.add_argument("--output", "-o", type=Path, help="where to write the verdicts (default: stdout)")
+    parser.add_argument("--exercises", type=Path, default=DEFAULT_EXERCISES_JSON_FILE, help="the exercises JSON file")
+    parser.add_argument("--workers", type=int, help="number of worker processes (default: number of CPUs)")
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT_SECONDS,
+        help=f"seconds the code of each submission may run (default: {DEFAULT_TIMEOUT_SECONDS:g})",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with ExitStack() as stack:
+        submissions = sys.stdin
+        if str(args.submissions) != "-":
+            submissions = stack.enter_context(args.submissions.open(encoding="utf-8"))
+        output = sys.stdout
+        if args.output is not None:
+            output = stack.enter_context(args.output.open("w", encoding="utf-8"))
+        counts = grade_submissions(submissions, output, args.exercises, args.workers, args.timeout)
+    _print_stats(counts, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
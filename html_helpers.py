@@ -1,9 +1,48 @@
-from pyscript import document
-from pyscript.web import Element
+from virtual_dom import VNode
+
+try:
+    from pyscript import document
+    from pyscript.web import Element
+except ImportError:
+    # Not running in the browser, so there's no DOM and the helpers always build `VNode`s, which can be rendered to
+    # HTML strings
+    document = None
+    Element = VNode
+
+
+class _Backend:
+    """Decides whether `_tag` creates real DOM elements or `VNode`s.
+
+    In the browser, it creates DOM elements unless told otherwise by `_virtual_nodes`. Elsewhere, it always creates
+    `VNode`s.
+    """
+
+    virtual: bool = document is None
+
+
+class _VirtualNodes:
+    """The context manager returned by `_virtual_nodes`, written as a class because MicroPython has no contextlib."""
+
+    __slots__ = ("_previous",)
+
+    def __enter__(self) -> None:
+        self._previous = _Backend.virtual
+        _Backend.virtual = True
+
+    def __exit__(self, *_exc_info: object) -> None:
+        _Backend.virtual = self._previous
+
+
+def _virtual_nodes() -> _VirtualNodes:
+    """Make all helpers called inside the `with` block build `VNode`s instead of DOM elements.
+
+    The resulting tree can then be attached to the page in one go using `virtual_dom.mount`.
+    """
+    return _VirtualNodes()
 
 
 def _tag(tag_name: str, *children: Element | str, **attributes: str) -> Element:
-    node = document.createElement(tag_name)
+    node = VNode(tag_name) if _Backend.virtual else document.createElement(tag_name)
     if "className" in attributes:
         node.setAttribute("class", attributes["className"])
     for key, value in attributes.items():
@@ -0,0 +1,113 @@
+"""Re-rendering the preview while the user types.
+
+Changes in the editor are debounced, so the code only runs once the user stops typing for a moment. Live runs only
+update the preview: they don't validate the solution, so they neither count as wrong submissions nor unlock hints.
+"""
+
+import asyncio
+from functools import partial
+from typing import Final
+
+from code_runner import CodeRunner
+from html_helpers import _virtual_nodes, b, br, div
+from preview import Preview
+from proxy_registry import ProxyScope
+from pyscript.web import Element
+
+# How long the user has to stop typing before the code is run
+DEBOUNCE_DELAY_MS: Final[int] = 400
+
+
+class LivePreview:
+    """Runs the code in an editor whenever it changes and shows the result in a preview."""
+
+    __slots__ = (
+        "_editor",
+        "_error_area",
+        "_generation",
+        "_last_source",
+        "_preview",
+        "_proxies",
+        "_run_code",
+        "_running",
+        "_timer",
+        "enabled",
+    )
+
+    def __init__(self, editor: object, preview: Preview, error_area: Element, run_code: CodeRunner) -> None:
+        self._editor = editor
+        self._run_code = run_code
+        self._preview = preview
+        self._error_area = error_area
+        self.enabled = False
+        # Incremented on every change, so a scheduled run can tell whether newer input has arrived since
+        self._generation = 0
+        self._timer: int | None = None
+        # Destroys the proxy of a pending run when it's cancelled
+        self._proxies = ProxyScope()
+        self._running: asyncio.Future | None = None
+        # The source code whose output is currently shown, so unchanged code isn't run again
+        self._last_source: str | None = None
+
+    def set_enabled(self, enabled: bool) -> None:  # noqa: FBT001
+        """Turn live mode on or off. Turning it on immediately shows the output of the current code."""
+        self.enabled = enabled
+        if enabled:
+            self.schedule()
+        else:
+            self._cancel()
+
+    def schedule(self, *_args: object) -> None:
+        """Run the code once the user has stopped typing. Can be used as a handler for CodeMirror's change event."""
+        if not self.enabled:
+            return
+        self._cancel()
+        self._generation += 1
+        self._timer = self._proxies.set_timeout(partial(self._start, self._generation), DEBOUNCE_DELAY_MS)
+
+    def close(self) -> None:
+        """Stop running the code and destroy the proxies, when the editor goes away."""
+        self.enabled = False
+        self._cancel()
+        self._proxies.close()
+
+    def forget(self) -> None:
+        """Forget what's currently shown, e.g. because the preview was updated by something else."""
+        self._cancel()
+        self._generation += 1
+        self._last_source = None
+
+    def _cancel(self) -> None:
+        if self._timer is not None:
+            self._proxies.clear_timeout(self._timer)
+            self._timer = None
+
+    def _start(self, generation: int) -> None:
+        self._timer = None
+        self._running = asyncio.ensure_future(self._run(generation))
+
+    def _is_stale(self, generation: int) -> bool:
+        """Whether there has been newer input since the run with the given generation was scheduled."""
+        return generation != self._generation or not self.enabled
+
+    async def _run(self, generation: int) -> None:
+        if self._is_stale(generation):
+            return
+        source = self._editor.getValue()
+        if source == self._last_source:
+            return
+        try:
+            output = await self._run_code(source)
+        except Exception as err:
+            if self._is_stale(generation):
+                return
+            with _virtual_nodes():
+                error = div("The code did not produce valid HTML element.", br(), b("Error"), f": {err!s}")
+            self._error_area.innerHTML = error.outerHTML
+            self._last_source = source
+            return
+        if self._is_stale(generation):
+            return
+        self._error_area.innerHTML = ""
+        self._preview.show(output)
+        self._last_source = source
@@ -1,14 +1,20 @@
-import ast
+# Imported first, so that it can measure how long the other imports take
+import startup_timeline  # isort: skip
+import asyncio
+from contextlib import nullcontext
 from functools import partial
 from pathlib import Path
-from string import Template
-from typing import Final
-
-import html_helpers
-from element_components import custom_button, custom_code_block, custom_nav
-from exercises import Exercise, ExerciseGroup, load_exercises_from_json
+from typing import ClassVar, Final
+from urllib.parse import parse_qs
+
+import static_pages
+import submission_timing
+from code_runner import CodeRunner, WorkerCodeRunner, create_code_runner
+from element_components import custom_button, custom_code_block
+from exercises import Exercise, ExerciseCatalog, ExerciseGroupSummary
 from html_helpers import (
     _tag,
+    _virtual_nodes,
     a,
     b,
     br,
@@ -16,8 +22,6 @@ from html_helpers import (
     div,
     h1,
     h2,
-    hr,
-    i,
     iframe,
     li,
     p,
@@ -26,120 +30,90 @@ from html_helpers import (
     textarea,
     ul,
 )
+from live_preview import LivePreview
+from preview import Preview
+from progress_store import ProgressStore
+from proxy_registry import ProxyScope, live_proxy_count
 from pyodide.ffi.wrappers import add_event_listener
-from pyscript import document, when, window
+from pyodide.http import pyfetch
+from pyscript import document, window
 from pyscript.web import Element
+from router import EXERCISES_PAGE_NAME, NOT_FOUND_PAGE_NAME, SHELL_PAGE_NAME, Route, parse_route, route_href
 from solution_validator import validate_solution
+from virtual_dom import VNode, mount, render
+from windowed_list import ROW_HEIGHT_PX, WindowedList, windowed_list_viewport
+
+startup_timeline.end("imports")
+
+# Opening the exercises page with this query parameter shows the submission timings in a debug panel
+TIMINGS_QUERY_PARAMETER: Final[str] = "timings"
+# Where the submission timings report is made available for copying it
+SUBMISSION_TIMINGS_GLOBAL: Final[str] = "htmlTutorialSubmissionTimings"
+
+# Exercise groups with more exercises than this only show the links that are scrolled into view
+WINDOWED_GROUP_SIZE: Final[int] = 100
 
-EXERCISES_JSON_FILE: Final[Path] = Path("exercises.json")
+# Where the exercise bundle built by `bundle_exercises.py` is served from
+EXERCISES_BUNDLE_URL: Final[str] = "./bundle/"
+# Where the bundle ends up in the virtual filesystem when the app is packaged by `package_app.py`
+EXERCISES_BUNDLE_DIRECTORY: Final[Path] = Path("bundle")
 
-IFRAME_TEMPLATE: str = """<html>
-    <head>
-        <title>HTML Tutorial</title>
-    </head>
-    <body>
-        <div id="result">
-        ${RESULT}
-        </div>
-    </body>
-</html>
-"""
+
+async def _fetch_bundle_file(name: str) -> str:
+    path = EXERCISES_BUNDLE_DIRECTORY / name
+    if path.exists():
+        return path.read_text(encoding="utf-8")
+    response = await pyfetch(EXERCISES_BUNDLE_URL + name)
+    # Otherwise the error page would be parsed as JSON
+    if not response.ok:
+        msg = f"Couldn't load {name} of the exercise bundle: HTTP status {response.status}"
+        raise OSError(msg)
+    return await response.text()
 
 
 class AppStorage:
     """Application's local storage."""
 
-    EXERCISES: list[ExerciseGroup] = load_exercises_from_json(EXERCISES_JSON_FILE)
-    current_exercise: Exercise = EXERCISES[0].exercises[0]
-    wrong_submissions: int = 0
-    solved_exercises: set | None = None
+    CATALOG: ExerciseCatalog = ExerciseCatalog(_fetch_bundle_file)
+    current_group_index: int = 0
+    current_exercise_index: int = 0
+    progress: ProgressStore | None = None
 
     def __init__(self) -> None:
-        self.solved_exercises = set()
+        self.progress = ProgressStore.open()
 
     def get_current_exercise(self) -> Exercise:
         """Get current exercise that's being worked on."""
-        return self.current_exercise
+        return self.CATALOG.exercise(self.current_group_index, self.current_exercise_index)
 
     def set_current_exercise_by_index(self, group_index: int, exercise_index: int) -> None:
         """Set current exercise that's being worked on."""
-        self.current_exercise = self.EXERCISES[group_index].exercises[exercise_index]
+        self.current_group_index = group_index
+        self.current_exercise_index = exercise_index
 
-    def increment_wrong_submissions(self) -> None:
-        """Increment the number of wrong submissions."""
-        self.wrong_submissions += 1
+    def increment_wrong_submissions(self, title: str) -> None:
+        """Increment the number of wrong submissions for an exercise."""
+        self.progress.set_attempts(title, self.progress.get_attempts(title) + 1)
 
-    def get_wrong_submissions(self) -> int:
-        """Get the number of wrong submissions."""
-        return self.wrong_submissions
+    def get_wrong_submissions(self, title: str) -> int:
+        """Get the number of wrong submissions for an exercise."""
+        return self.progress.get_attempts(title)
 
-    def reset_wrong_submissions(self) -> None:
-        """Reset the number of wrong submissions."""
-        self.wrong_submissions = 0
+    def reset_wrong_submissions(self, title: str) -> None:
+        """Reset the number of wrong submissions for an exercise."""
+        self.progress.set_attempts(title, 0)
 
 
 AppState: AppStorage = AppStorage()
 
 
-def _update_iframe(frame: Element, content: Element) -> None:
-    """Update the contents of a given iframe.
-
-    Args:
-        frame (Element): The iframe element to update.
-        content (str | Element): The HTML content to display in the iframe's body.
-
-    """
-    try:
-        content = content.outerHTML
-    except Exception as e:
-        print(e)
-    iframe_contents = Template(IFRAME_TEMPLATE).safe_substitute(RESULT=content)
-    frame.setAttribute("srcdoc", iframe_contents)
-
-
-def _display_result(output_area: Element, result: Element) -> None:
-    """Display the result in the output area.
-
-    Args:
-        output_area (Element): The element to update with the result.
-        result (Element): The result to display.
-
-    """
-    if isinstance(result, str) or hasattr(result, "getHTML"):
-        result_html = result
-    else:
-        result_html = str(result)
-
-    _update_iframe(output_area, result_html)
-
-
-def _validate_user_input(source: str) -> Element:
-    output = div()
-    environment = {name: value for name, value in html_helpers.__dict__.items() if not name.startswith("_")}
-    tree = ast.parse(source)
-    for statement in tree.body:
-        match statement:
-            case ast.Expr():
-                result = eval(compile(ast.Expression(statement.value), "", mode="eval"), globals=environment)
-                if hasattr(result, "classList") or isinstance(result, str):
-                    output.append(result)
-                else:
-                    err = f"""
-                    Expression returned {result} (of type {type(result)}), instead of an HTML element or string
-                    """.strip()
-                    raise ValueError(err)
-            case ast.FunctionDef() | ast.Assign():
-                exec(compile(ast.Module([statement]), "", mode="exec"), globals=environment)
-    return output
-
-
-def _evaluate_solution(
+async def _evaluate_solution(
     source: str = "",
-    output_area: Element = None,
+    preview: Preview = None,
     error_area: Element = None,
     info_area: Element = None,
 ) -> None:
-    if output_area is None or error_area is None or info_area is None:
+    if preview is None or error_area is None or info_area is None:
         print("Error, invalid inputs")
         return
 
@@ -147,198 +121,238 @@ def _evaluate_solution(
         error_area.append(div("Please enter some code to evaluate.", style="color: initial;"))
         return
 
-    output_area.innerHTML = ""
     error_area.innerHTML = ""
     info_area.innerHTML = ""
 
     exercise = AppState.get_current_exercise()
+    exercise_indices = (AppState.current_group_index, AppState.current_exercise_index)
     expected = exercise.answer
 
-    # Attempt to generate HTML
     try:
-        output = _validate_user_input(source)
-    except Exception as err:
-        error_area.append(div("The code did not produce valid HTML element.", br(), b("Error"), f": {err!s}"))
-        _display_result(output_area, "")
+        with submission_timing.submission(exercise.title):
+            # Attempt to generate HTML
+            try:
+                with submission_timing.stage("execute"):
+                    output = await _run_code(source)
+            except Exception as err:
+                if _is_current_exercise(exercise_indices):
+                    error_area.append(
+                        div("The code did not produce valid HTML element.", br(), b("Error"), f": {err!s}"),
+                    )
+                    preview.show(None)
+                return
+
+            with submission_timing.stage("validate"):
+                correct_solution, msg = validate_solution(expected, output, exercise.answer_tree)
+            if not correct_solution:
+                AppState.increment_wrong_submissions(exercise.title)
+            else:
+                AppState.reset_wrong_submissions(exercise.title)
+                AppState.progress.mark_solved(exercise.title)
+                _mark_solved(*exercise_indices)
+
+            # While the code ran in a worker, the learner may have opened another exercise, whose panes the results
+            # of this one must not end up in. The verdict has still been recorded above.
+            if not _is_current_exercise(exercise_indices):
+                return
+
+            with submission_timing.stage("hints"):
+                wrong_submissions = AppState.get_wrong_submissions(exercise.title)
+                hints = [li(hint.message) for hint in exercise.error_hints if wrong_submissions >= hint.after_tries]
+
+                info_area.append(msg)
+
+                if hints:
+                    info_area.append(div("Hints:", ul(*hints)))
+
+            with submission_timing.stage("preview"):
+                preview.show(output)
+    finally:
+        if _is_current_exercise(exercise_indices):
+            _update_timing_panel(exercise.title)
+
+
+def _is_current_exercise(exercise_indices: tuple[int, int]) -> bool:
+    return exercise_indices == (AppState.current_group_index, AppState.current_exercise_index)
+
+
+def _update_timing_panel(exercise_title: str) -> None:
+    """Show the submission timings of an exercise in the debug panel, if it's enabled."""
+    if ExercisesView.timing_panel is None:
         return
-
-    correct_solution, msg = validate_solution(expected, output)
-    if not correct_solution:
-        AppState.increment_wrong_submissions()
-    else:
-        AppState.reset_wrong_submissions()
-        AppState.solved_exercises.add(exercise.title)
-
-    hints = [
-        li(hint.message)
-        for hint in AppState.get_current_exercise().error_hints
-        if AppState.get_wrong_submissions() >= hint.after_tries
-    ]
-
-    info_area.append(msg)
-
-    if hints:
-        info_area.append(div("Hints:", ul(*hints)))
-
-    _display_result(output_area, output)
+    setattr(window, SUBMISSION_TIMINGS_GLOBAL, submission_timing.report_json())
+    panel = submission_timing.timing_panel(exercise_title, f"copyToClipboard(window.{SUBMISSION_TIMINGS_GLOBAL})")
+    with _virtual_nodes():
+        # Stays flat while the learner moves between exercises if no proxies are leaked
+        proxy_count = div(f"Live JavaScript proxies: {live_proxy_count()}")
+    ExercisesView.timing_panel.innerHTML = render(panel, proxy_count)
+
+
+async def _run_code(source: str) -> VNode:
+    """Run the user's code with the page's code runner, showing the stop button while it runs in a worker."""
+    run_code = ExercisesView.run_code
+    stop_button = document.getElementById("stop-button")
+    stop_button.hidden = not isinstance(run_code, WorkerCodeRunner)
+    try:
+        return await run_code(source)
+    finally:
+        stop_button.hidden = not (isinstance(run_code, WorkerCodeRunner) and run_code.busy)
 
 
-def _main() -> None:
-    document.head.append(
-        _tag(
-            "style",
-            "@import url('https://fonts.googleapis.com/css2?family=Bricolage+Grotesque:opsz,wght@12..96,200..800&family"
-            "=Google+Sans"
-            "+Code:ital,wght@0,300..800;1,300..800&display=swap');"
-            "body {font-family: 'Bricolage Grotesque', sans-serif;}"
-            ".cm-editor, .CodeMirror {font-family: 'Google Sans Code', monospace;}",
-        ),
-        _tag(
-            "script",
-            """
-function copyToClipboard(text, callback=()=>{}) {
-    navigator.clipboard.writeText(text).then(() => {
-        if (callback) callback();
-    });
-}
-""",
+def _submit(*_args: object) -> None:
+    """Evaluate and validate the code in the editor, unless the previous submission is still being evaluated."""
+    if ExercisesView.submission is not None and not ExercisesView.submission.done():
+        return
+    ExercisesView.submission = asyncio.ensure_future(
+        _evaluate_solution(
+            ExercisesView.editor.getValue(),
+            ExercisesView.preview,
+            ExercisesView.error_area,
+            ExercisesView.info_area,
         ),
     )
 
-    document.body.append(
-        custom_nav(),
-    )
 
+async def _main() -> None:
     page_name = document.querySelector("meta[name='page-name']").content
-    match page_name:
-        case "home":
-            _home_page()
-        case "exercises":
-            _exercises_page()
-        case _:
-            _404_page()
+    with startup_timeline.phase("render"):
+        # Pages pre-rendered by prerender.py already contain their static content
+        if document.getElementById(static_pages.STATIC_CONTENT_ID) is None:
+            document.head.append(*static_pages.head_elements())
+            with _virtual_nodes():
+                mount(document.body, static_pages.page_body(page_name))
+        if page_name == SHELL_PAGE_NAME:
+            ShellView.proxies.add_event_listener(window, "hashchange", _route_listener)
+            # Not part of a scope, because it closes them
+            add_event_listener(window, "pagehide", _close_views)
+            await _show_route(parse_route(window.location.hash))
+    startup_timeline.finish()
+
+
+class ShellView:
+    """The state of the shell page, which switches between the views of the app."""
+
+    # Owns the proxies of the functions handling the navigation
+    proxies: ProxyScope = ProxyScope()
+    # Routes are shown one at a time, since showing the exercises may have to wait for them to be loaded
+    navigation_lock: asyncio.Lock = asyncio.Lock()
+    # The latest navigation, kept so that it isn't garbage collected while it runs
+    navigation: asyncio.Future | None = None
+
+
+def _close_views(event: object) -> None:
+    """Destroy the proxies of all views when the page is left for good.
+
+    A page that's put into the back/forward cache (`persisted`) may be shown again as it was, so it keeps them.
+    """
+    if event.persisted:
+        return
+    if ExercisesView.live_preview is not None:
+        ExercisesView.live_preview.close()
+    ExercisesView.proxies.close()
+    ShellView.proxies.close()
 
 
-def _404_page() -> None:
-    document.body.append(
-        div(
-            h1("404 Not Found"),
-            p("The page you are looking for does not exist."),
-            a(
-                "Go back to Home",
-                href="./index.html",
-                style="color: blue; text-decoration: none;",
-                onmouseover="this.style.textDecoration = 'underline';",
-                onmouseleave="this.style.textDecoration = 'none';",
-            ),
-            style="text-align: center; margin-top: 2em;",
-        ),
-    )
+def _route_listener(_event: object) -> None:
+    ShellView.navigation = asyncio.ensure_future(_show_route(parse_route(window.location.hash)))
 
 
-def _home_page() -> None:
-    document.body.append(
-        div(
-            h1("About this Project", style="margin:0;"),
-            p(
-                "This project was created as part of ",
-                b("Python Code Jam 2025"),
-                ", where the theme was ",
-                i("Wrong Tool for the Job"),
-                ".",
-                style="margin: 0.5em 0 1em 0;",
-            ),
-            hr(),
-            h2("The Idea", style="margin:1em 0 0 0;"),
-            p(
-                "Our entry takes the form of an ",
-                b("HTML Tutorial"),
-                " but with a twist. Instead of writing HTML, user write ",
-                b("Python code"),
-                " to complete each exercise. For example, rather than typing:",
-                style="margin: 0.5em 0 1em 0;",
-            ),
-            custom_code_block("<div>Hello <em>World</em>!</div>", language="html"),
-            p("the user writes:"),
-            custom_code_block('div("Hello ", em("World"), "!")', language="python"),
-            p(
-                "The Python is then executed directly in the browser to generate the HTML, which is "
-                "displayed alongside the code editor. Each chapter introduces a new HTML concept, "
-                "followed by exercises that can only be solved by writing Python that outputs the "
-                "correct HTML structure.",
-            ),
-            hr(),
-            h2("Why This Fits the Theme", style="margin:1em 0 0 0;"),
-            p(
-                "At its core, the project is about teaching HTML, but we're doing it with Python, arguably the "
-                "wrong tool for the job. This mismatch captures the spirit of the Code Jam's theme while also "
-                'making for an engaging, "playful" learning experience.',
-                style="margin: 0.5em 0 0.5em 0;",
-            ),
-            p(
-                "It's also a fun exploration of ",
-                b('"Python in the browser"'),
-                ". Everything-tutorial logic, code execution, and validation-is written in Python. The user writes "
-                "Python, the site runs Python, and all of it ultimately produces HTML (Plus CSS and JavaScript).",
-                style="margin: 0.5em 0 1em 0;",
-            ),
-            hr(),
-            custom_code_block(
-                "• @psyklopps42 (Sebastian)",
-                "• @kcatloaf (Granth)",
-                "• @0w3n (Owen)",
-                "• @AMK (Amen Ellah)",
-                "• @kuro (Mohammad)",
-                language="authors",
-                copy_tip="none",
-            ),
-            style="display:flex; flex-direction:column; max-width: 70vw; margin: 2em auto 2em auto;"
-            "background-color:#eeeeee; padding: 2em; border-radius: 1em; "
-            "box-shadow: rgba(60, 64, 67, 0.3) 0px 1px 2px 0px, rgba(60, 64, 67, 0.15) 0px 2px 6px 2px;",
-        ),
-    )
+def _exercise_exists(group_index: int, exercise_index: int) -> bool:
+    groups = AppState.CATALOG.groups
+    return group_index < len(groups) and exercise_index < len(groups[group_index].exercise_titles)
+
 
+async def _load_exercises(route: Route) -> Route:
+    """Load the exercises a route to the exercises page needs.
 
-def _exercise_link_listener(group_index: int, exercise_index: int, *args, **kwargs) -> None:  # noqa: ARG001, ANN002, ANN003
+    Returns the route, or the route to the 404 page if it points to an exercise that doesn't exist or if the exercises
+    can't be loaded.
+    """
+    catalog = AppState.CATALOG
+    try:
+        await catalog.load()
+        if route.group_index is None:
+            group_index = AppState.current_group_index
+        elif _exercise_exists(route.group_index, route.exercise_index):
+            group_index = route.group_index
+        else:
+            return Route(NOT_FOUND_PAGE_NAME)
+        await catalog.load(group_index)
+    except OSError as err:
+        print(err)
+        return Route(NOT_FOUND_PAGE_NAME)
+    return route
+
+
+async def _show_route(route: Route) -> None:
+    """Show the view a route points to and hide the others. Views are created the first time they're shown."""
+    async with ShellView.navigation_lock:
+        if route.page_name == EXERCISES_PAGE_NAME:
+            # Only measured for the first time, later navigations at most load another group
+            first_time = document.getElementById(static_pages.view_id(EXERCISES_PAGE_NAME)) is None
+            with startup_timeline.phase("load-exercises") if first_time else nullcontext():
+                route = await _load_exercises(route)
+        _switch_view(route)
+
+
+def _switch_view(route: Route) -> None:
+    """Show the view of a route whose exercises have been loaded."""
+    view = document.getElementById(static_pages.view_id(route.page_name))
+    if route.page_name == EXERCISES_PAGE_NAME:
+        exercise_indices = (route.group_index, route.exercise_index)
+        selected = route.group_index is None or _is_current_exercise(exercise_indices)
+        if view is None:
+            if not selected:
+                AppState.set_current_exercise_by_index(*exercise_indices)
+            # Part of the render phase if the page is opened on this view, recorded after the startup otherwise
+            with startup_timeline.phase("exercises-view"):
+                _exercises_page()
+        elif not selected:
+            _select_exercise(*exercise_indices)
+    elif view is None:
+        with _virtual_nodes():
+            mount(document.body, static_pages.page_view(route.page_name))
+    shown_id = static_pages.view_id(route.page_name)
+    for other_view in document.querySelectorAll("[data-view]"):
+        other_view.hidden = other_view.id != shown_id
+    if route.page_name == EXERCISES_PAGE_NAME:
+        # CodeMirror can't measure itself while it's hidden
+        ExercisesView.editor.refresh()
+
+
+def _select_exercise(group_index: int, exercise_index: int) -> None:
     AppState.set_current_exercise_by_index(group_index, exercise_index)
-    AppState.reset_wrong_submissions()
-    document.body.innerHTML = ""
-    _main()
+    # Opening the exercise's group creates its links, if that hasn't happened yet
+    document.querySelector(f"details[data-group='{group_index}']").open = True
+    _show_exercise(AppState.get_current_exercise())
 
 
-def _create_exercise_group(exercise_group: ExerciseGroup, group_index: int) -> Element:
-    """Create a collapsible exercise group."""
-    # create links for each exercise
-    exercise_links = [
+def _exercise_link(group_index: int, exercise_index: int) -> VNode:
+    """Create the sidebar entry linking to an exercise."""
+    title = AppState.CATALOG.groups[group_index].exercise_titles[exercise_index]
+    return li(
         a(
-            f"{index + 1}. {exercise.title}",
-            span("✓", style="color: green;") if exercise.title in AppState.solved_exercises else "",
-            href="#",
-            style="text-decoration: none;",
-            onmouseover="this.style.textDecoration = 'underline';",
-            onmouseleave="this.style.textDecoration = 'none';",
-        )
-        for index, exercise in enumerate(exercise_group.exercises)
-    ]
-
-    # add callback for each link
-    for index, link in enumerate(exercise_links):
-        add_event_listener(
-            link,
-            "click",
-            partial(
-                _exercise_link_listener,
-                group_index,
-                index,
+            f"{exercise_index + 1}. {title}",
+            span(
+                "✓" if title in AppState.progress.solved else "",
+                id=_solved_marker_id(group_index, exercise_index),
+                style="color: green;",
             ),
-        )
-
-    # create exercise list
-    exercise_list = ul(
-        *[li(exercise_link, style="margin: 0.5em 0;") for exercise_link in exercise_links],
-        style="list-style-type: none; margin: 0; padding: 0; cursor: pointer;",
+            href=route_href(EXERCISES_PAGE_NAME, group_index, exercise_index),
+            **{"class": "exercise-link"},
+        ),
+        style=f"height: {ROW_HEIGHT_PX}px; display: flex; align-items: center;",
     )
 
+
+def _create_exercise_group(exercise_group: ExerciseGroupSummary, group_index: int) -> VNode:
+    """Create a collapsible exercise group. Its exercise list stays empty until the group is opened."""
+    list_id = _exercise_list_id(group_index)
+    if len(exercise_group.exercise_titles) > WINDOWED_GROUP_SIZE:
+        exercise_list = windowed_list_viewport(len(exercise_group.exercise_titles), id=list_id)
+    else:
+        exercise_list = ul(id=list_id, style="list-style-type: none; margin: 0; padding: 0; cursor: pointer;")
+
     # create collapsible exercise group
     group = details(
         summary(
@@ -346,26 +360,151 @@ def _create_exercise_group(exercise_group: ExerciseGroup, group_index: int) -> E
             style="cursor: pointer; margin: 0; border: 1px solid #eee;",
         ),
         exercise_list,
+        **{"data-group": str(group_index)},
     )
 
-    if AppState.current_exercise in exercise_group.exercises:
-        group.open = True
+    if group_index == AppState.current_group_index:
+        group.setAttribute("open", "")
 
     return group
 
 
-def list_exercises() -> list[Element]:
+def _exercise_list_id(group_index: int) -> str:
+    return f"exercise-list-{group_index}"
+
+
+def _solved_marker_id(group_index: int, exercise_index: int) -> str:
+    return f"solved-marker-{group_index}-{exercise_index}"
+
+
+def _mark_solved(group_index: int, exercise_index: int) -> None:
+    marker = document.getElementById(_solved_marker_id(group_index, exercise_index))
+    # The link isn't there if its group hasn't been opened yet or if it's scrolled out of a windowed list
+    if marker is not None:
+        marker.textContent = "✓"
+
+
+def _fill_exercise_group(group_index: int) -> None:
+    """Create the links in an exercise group, unless that has already happened."""
+    if group_index in ExercisesView.filled_groups:
+        return
+    ExercisesView.filled_groups.add(group_index)
+    exercise_count = len(AppState.CATALOG.groups[group_index].exercise_titles)
+    exercise_list = document.getElementById(_exercise_list_id(group_index))
+
+    if exercise_count > WINDOWED_GROUP_SIZE:
+        windowed_list = WindowedList(
+            exercise_list,
+            exercise_count,
+            partial(_exercise_link, group_index),
+            ExercisesView.proxies,
+        )
+        if group_index == AppState.current_group_index:
+            windowed_list.scroll_to(AppState.current_exercise_index)
+        return
+
+    with _virtual_nodes():
+        links = [_exercise_link(group_index, index) for index in range(exercise_count)]
+    mount(exercise_list, *links)
+
+
+def _sidebar_toggle_listener(event: object) -> None:
+    group = event.target
+    if group.localName == "details" and group.open:
+        _fill_exercise_group(int(group.dataset.group))
+
+
+def _add_sidebar_listener(sidebar: Element) -> None:
+    """Fill the exercise groups when they're opened, with one listener on the sidebar for all of them.
+
+    The links don't need listeners at all: they point to their exercise's route, which is handled by the router.
+    """
+    # toggle events don't bubble, so they have to be caught on their way down to the <details> element
+    ExercisesView.proxies.add_event_listener(sidebar, "toggle", _sidebar_toggle_listener, capture=True)
+
+
+def list_exercises() -> list[VNode]:
     """List exercises as a collapsible list of exercise groups."""
-    return [_create_exercise_group(exercise_group, index) for index, exercise_group in enumerate(AppState.EXERCISES)]
+    return [
+        _create_exercise_group(exercise_group, index) for index, exercise_group in enumerate(AppState.CATALOG.groups)
+    ]
+
+
+class ExercisesView:
+    """The parts of the exercises page that change when a different exercise is selected."""
+
+    editor: object = None
+    info_area: Element = None
+    error_area: Element = None
+    preview: Preview = None
+    live_preview: LivePreview = None
+    run_code: CodeRunner = None
+    # The evaluation of the latest submission, which the results of a new one must not be mixed with
+    submission: asyncio.Future | None = None
+    # The exercise groups whose links have been created
+    filled_groups: ClassVar[set[int]] = set()
+    # Exercise title -> the CodeMirror document holding the exercise's code and undo history
+    documents: ClassVar[dict[str, object]] = {}
+    # Owns the proxies of all functions the page hands to JavaScript
+    proxies: ProxyScope = ProxyScope()
+    timing_panel: Element | None = None
+
+
+def _exercise_details(exercise: Exercise) -> list[VNode]:
+    """Create the title, description and example of an exercise."""
+    return [
+        h2(exercise.title),
+        div(
+            p(exercise.description, style="margin: 0.5em 0;"),
+            custom_code_block(exercise.example, language="Example", copy_tip="none"),
+            br(),
+        ),
+    ]
+
+
+def _show_exercise(exercise: Exercise) -> None:
+    """Switch the exercises page to another exercise, keeping the sidebar and the editor in place."""
+    with _virtual_nodes():
+        exercise_details = _exercise_details(exercise)
+    document.getElementById("exercise-details").innerHTML = render(*exercise_details)
+    ExercisesView.info_area.innerHTML = ""
+    ExercisesView.error_area.innerHTML = ""
+    ExercisesView.live_preview.forget()
+    ExercisesView.preview.show(None)
+    ExercisesView.editor.swapDoc(_exercise_document(exercise.title))
+    # Unlike setting the editor's value, swapping documents doesn't count as a change
+    ExercisesView.live_preview.schedule()
+    _update_timing_panel(exercise.title)
+
+
+def _exercise_document(exercise_title: str) -> object:
+    """Get the editor document of an exercise, creating it from the saved draft when the exercise is first shown."""
+    editor_document = ExercisesView.documents.get(exercise_title)
+    if editor_document is None:
+        editor_document = window.CodeMirror.Doc.new(AppState.progress.get_draft(exercise_title), "python")
+        ExercisesView.documents[exercise_title] = editor_document
+    return editor_document
+
+
+def _has_query_parameter(name: str) -> bool:
+    return name in parse_qs(window.location.search.removeprefix("?"), keep_blank_values=True)
+
+
+def _save_draft(*_args: object) -> None:
+    """Remember the code in the editor for the current exercise. Used as a handler for CodeMirror's change event."""
+    AppState.progress.set_draft(AppState.get_current_exercise().title, ExercisesView.editor.getValue())
 
 
 def _exercises_page() -> None:
     exercise = AppState.get_current_exercise()
-    document.body.append(
-        div(
+    # The page is built as a virtual tree and mounted in one go. The elements we need to attach behavior to are
+    # looked up by their ids afterwards.
+    with _virtual_nodes():
+        page = div(
             div(
                 h1("Exercises"),
                 *list_exercises(),
+                id="exercise-sidebar",
                 style="""
 resize: horizontal; overflow: auto; min-width: 25%; max-width:75%;
 border-right: 1px solid #ccc; padding: 0.5em;
@@ -373,62 +512,76 @@ border-right: 1px solid #ccc; padding: 0.5em;
             ),
             div(
                 div(
-                    h2(exercise.title),
-                    div(
-                        p(exercise.description, style="margin: 0.5em 0;"),
-                        custom_code_block(exercise.example, language="Example", copy_tip="none"),
-                        br(),
-                    ),
-                    code_area := textarea(""),
-                    submit_button := custom_button("Submit"),
+                    div(*_exercise_details(exercise), id="exercise-details"),
+                    textarea("", id="code-area"),
+                    custom_button("Submit", id="submit-button"),
+                    custom_button("Stop", id="stop-button", hidden=""),
                     span("Or press Ctrl/Cmd+Enter", style="margin-left: 1em; color: #aaa"),
+                    _tag(
+                        "label",
+                        _tag("input", type="checkbox", id="live-preview-toggle"),
+                        " Live preview",
+                        style="margin-left: 1em;",
+                    ),
+                    div(id="timing-panel") if _has_query_parameter(TIMINGS_QUERY_PARAMETER) else "",
                     style="border-bottom: 1px solid #ccc;padding: 0.5em;flex: 1;",
                 ),
                 div(
                     h2("Output:"),
-                    info_area := div(),
-                    error_area := div(style="color: red;"),
-                    output_area := iframe(style="border: none; width: 95%; height: 85%;"),
+                    div(id="info-area"),
+                    div(id="error-area", style="color: red;"),
+                    iframe(id="output-area", style="border: none; width: 95%; height: 85%;"),
                     style="flex: 1; padding: 0.5em; height:50%;",
                 ),
                 style="flex: 1;",
             ),
             style="display: flex; width:99vw; height: 90vh; border: 1px solid #ccc;",
-        ),
-    )
-
-    editor = window.CodeMirror.fromTextArea(
-        code_area,
-        {
-            "lineNumbers": True,
-            "mode": "python",
-            "theme": "zenburn",
-            "extraKeys": {
-                "Ctrl-Enter": lambda _: _evaluate_solution(
-                    editor.getValue(),
-                    output_area,
-                    error_area,
-                    info_area,
-                ),
-                "Cmd-Enter": lambda _: _evaluate_solution(
-                    editor.getValue(),
-                    output_area,
-                    error_area,
-                    info_area,
-                ),
+        )
+        # Wrapped, so that hiding the view isn't overridden by the page's display style
+        view = div(page, id=static_pages.view_id(EXERCISES_PAGE_NAME), **{"data-view": EXERCISES_PAGE_NAME})
+    mount(document.body, view)
+    _add_sidebar_listener(document.getElementById("exercise-sidebar"))
+    _fill_exercise_group(AppState.current_group_index)
+
+    code_area = document.getElementById("code-area")
+    submit_button = document.getElementById("submit-button")
+    ExercisesView.info_area = document.getElementById("info-area")
+    error_area = ExercisesView.error_area = document.getElementById("error-area")
+    preview = ExercisesView.preview = Preview(document.getElementById("output-area"))
+    run_code = ExercisesView.run_code = create_code_runner()
+    ExercisesView.timing_panel = document.getElementById("timing-panel")
+    _update_timing_panel(exercise.title)
+
+    proxies = ExercisesView.proxies
+    submit = proxies.proxy(_submit)
+    with startup_timeline.phase("editor"):
+        editor = ExercisesView.editor = window.CodeMirror.fromTextArea(
+            code_area,
+            {
+                "lineNumbers": True,
+                "mode": "python",
+                "theme": "zenburn",
+                "extraKeys": {
+                    "Ctrl-Enter": submit,
+                    "Cmd-Enter": submit,
+                },
             },
-        },
-    )
-    when(
-        "click",
-        submit_button,
-        handler=lambda _: _evaluate_solution(
-            editor.getValue(),
-            output_area,
-            error_area,
-            info_area,
-        ),
+        )
+    editor.swapDoc(_exercise_document(exercise.title))
+    editor.on("change", proxies.proxy(_save_draft))
+    proxies.add_event_listener(submit_button, "click", _submit)
+    if isinstance(run_code, WorkerCodeRunner):
+        proxies.add_event_listener(document.getElementById("stop-button"), "click", lambda _: run_code.restart())
+
+    live_preview = ExercisesView.live_preview = LivePreview(editor, preview, error_area, run_code)
+    editor.on("change", proxies.proxy(live_preview.schedule))
+    live_preview_toggle = document.getElementById("live-preview-toggle")
+    proxies.add_event_listener(
+        live_preview_toggle,
+        "change",
+        lambda _: live_preview.set_enabled(live_preview_toggle.checked),
     )
 
 
-_main()
+# Kept, so that the startup isn't garbage collected while it waits for the exercises to load
+_startup = asyncio.ensure_future(_main())  # noqa: RUF006
@@ -0,0 +1,115 @@
+"""Package the app for deployment.
+
+All Python modules from `pyscript.json`, `main.py` and the exercise bundle are put into a single zip archive, which
+PyScript fetches and unpacks into Pyodide's filesystem in one go, instead of fetching every file on its own. The
+archive's name contains a hash of its contents, so it can be cached forever. The packaged pages also register a
+service worker that caches the archive and the runtime loaded from CDNs, so repeat visits boot without the network.
+
+The output directory is a complete static site. Try it with:
+
+    python bundle_exercises.py
+    python package_app.py
+    python -m http.server --directory dist 8000
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import shutil
+import zipfile
+from pathlib import Path
+from string import Template
+from typing import Final
+
+ROOT: Final[Path] = Path(__file__).parent
+DEFAULT_OUTPUT_DIRECTORY: Final[Path] = ROOT / "dist"
+
+# The pages that run main.py
+PAGES: Final[list[str]] = ["index.html"]
+STATIC_DIRECTORIES: Final[list[str]] = ["assets"]
+# Files that are fetched by their URL at runtime, rather than from the archive, and pages that don't run Python
+STATIC_FILES: Final[list[str]] = ["code_runner_worker.py", "exercises.html", "about.html", "404.html"]
+# The PyScript configs whose files go into the archive
+CONFIGS: Final[list[str]] = ["pyscript.json", "worker.json"]
+SERVICE_WORKER: Final[str] = "service_worker.js"
+
+MAIN_SCRIPT_TAG: Final[str] = '<script type="py" src="./main.py" config="./pyscript.json"></script>'
+PACKAGED_MAIN_SCRIPT_TAG: Final[str] = '<script type="py" config="./pyscript.json">import main</script>'
+SERVICE_WORKER_REGISTRATION: Final[str] = f"""    <script>
+        if ("serviceWorker" in navigator) navigator.serviceWorker.register("./{SERVICE_WORKER}");
+    </script>
+</head>"""
+
+# Zip entries get a fixed timestamp, so that the archive (and thus its name) only changes when its contents do
+_ZIP_TIMESTAMP: Final[tuple[int, ...]] = (1980, 1, 1, 0, 0, 0)
+
+
+def _archive_files() -> list[str]:
+    """Get the paths of all files that go into the archive, relative to the repository root."""
+    files = {"main.py"}
+    for config in CONFIGS:
+        files.update(json.loads((ROOT / config).read_text(encoding="utf-8"))["files"].values())
+    files.update(path.relative_to(ROOT).as_posix() for path in (ROOT / "bundle").iterdir())
+    return sorted(files)
+
+
+def _build_archive(files: list[str]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for file in files:
+            info = zipfile.ZipInfo(file, _ZIP_TIMESTAMP)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            archive.writestr(info, (ROOT / file).read_bytes())
+    return buffer.getvalue()
+
+
+def _package_page(page: str) -> str:
+    html = (ROOT / page).read_text(encoding="utf-8")
+    if MAIN_SCRIPT_TAG not in html:
+        msg = f"{page} doesn't load main.py the usual way: {MAIN_SCRIPT_TAG}"
+        raise ValueError(msg)
+    return html.replace(MAIN_SCRIPT_TAG, PACKAGED_MAIN_SCRIPT_TAG).replace("</head>", SERVICE_WORKER_REGISTRATION, 1)
+
+
+def package_app(output_directory: Path) -> str:
+    """Write the packaged app to the output directory, replacing what was there, and return its version."""
+    archive = _build_archive(_archive_files())
+    version = hashlib.sha256(archive).hexdigest()[:12]
+    archive_name = f"app-{version}.zip"
+
+    if output_directory.exists():
+        shutil.rmtree(output_directory)
+    output_directory.mkdir(parents=True)
+
+    (output_directory / archive_name).write_bytes(archive)
+    for config in CONFIGS:
+        packaged_config = {"files": {f"./{archive_name}": "./*"}}
+        (output_directory / config).write_text(json.dumps(packaged_config, indent=2) + "\n", encoding="utf-8")
+    for page in PAGES:
+        (output_directory / page).write_text(_package_page(page), encoding="utf-8")
+    for file in STATIC_FILES:
+        shutil.copy(ROOT / file, output_directory / file)
+    for directory in STATIC_DIRECTORIES:
+        shutil.copytree(ROOT / directory, output_directory / directory)
+
+    precache_urls = ["./", *(f"./{name}" for name in [*PAGES, *CONFIGS, *STATIC_FILES, archive_name])]
+    service_worker = Template((ROOT / SERVICE_WORKER).read_text(encoding="utf-8")).safe_substitute(
+        VERSION=version,
+        PRECACHE_URLS=json.dumps(precache_urls),
+    )
+    (output_directory / SERVICE_WORKER).write_text(service_worker, encoding="utf-8")
+    return version
+
+
+def main() -> None:
+    """Run the packaging."""
+    parser = argparse.ArgumentParser(description="Package the app into a static site with a single code archive.")
+    parser.add_argument("--output", "-o", type=Path, default=DEFAULT_OUTPUT_DIRECTORY)
+    args = parser.parse_args()
+    version = package_app(args.output)
+    print(f"Packaged version {version} into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Pre-render the static parts of the pages into the HTML files.
+
+The navigation bar, the home and 404 pages and the styles and scripts in the <head> never change, so instead of
+waiting for Python to start in the browser, they're rendered here, under CPython, by the same functions `main.py`
+would use. The output is written between the `<!-- prerendered:head -->` and `<!-- prerendered:body -->` marker
+comments of each page. `main.py` notices the pre-rendered content and only adds what's dynamic. The about and 404
+pages consist of nothing but their pre-rendered content, so they don't load PyScript at all. Rerun this after changing
+`static_pages.py` or `element_components.py`.
+
+Usage:
+    python prerender.py [--check]
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+from typing import Final
+
+from html_helpers import _virtual_nodes
+from static_pages import head_elements, page_body
+from virtual_dom import render
+
+ROOT: Final[Path] = Path(__file__).parent
+PAGES: Final[list[str]] = ["index.html", "about.html", "404.html"]
+
+_PAGE_NAME: Final[re.Pattern] = re.compile(r'<meta name="page-name" content="([^"]*)">')
+
+
+def _replace_region(html: str, name: str, contents: str) -> str:
+    region = re.compile(rf"(?P<indent>[ \t]*)<!-- prerendered:{name} -->.*?<!-- /prerendered:{name} -->", re.DOTALL)
+    match = region.search(html)
+    if match is None:
+        msg = f"Missing <!-- prerendered:{name} --> marker"
+        raise ValueError(msg)
+    indent = match["indent"]
+    replacement = f"{indent}<!-- prerendered:{name} -->\n{indent}{contents}\n{indent}<!-- /prerendered:{name} -->"
+    return html[: match.start()] + replacement + html[match.end() :]
+
+
+def prerender_page(html: str) -> str:
+    """Fill the pre-rendered regions of a page with the static content for its page name."""
+    page_name = _PAGE_NAME.search(html)[1]
+    with _virtual_nodes():
+        head = render(*head_elements())
+        body = render(page_body(page_name))
+    return _replace_region(_replace_region(html, "head", head), "body", body)
+
+
+def main() -> None:
+    """Pre-render all pages, or with --check, only report whether they're up to date."""
+    parser = argparse.ArgumentParser(description="Pre-render the static parts of the pages into the HTML files.")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if any page is out of date")
+    args = parser.parse_args()
+    outdated = []
+    for page in PAGES:
+        path = ROOT / page
+        html = path.read_text(encoding="utf-8")
+        prerendered = prerender_page(html)
+        if prerendered == html:
+            continue
+        outdated.append(page)
+        if not args.check:
+            path.write_text(prerendered, encoding="utf-8")
+    if args.check and outdated:
+        print(f"Out of date, run prerender.py: {', '.join(outdated)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
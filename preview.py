@@ -0,0 +1,141 @@
+"""The iframe that shows the HTML generated by the user's code.
+
+Instead of loading a new document for every submission, the iframe's document is kept alive and only the contents of
+its `#result` container are updated. The new output is compared to the previously shown one and only the elements,
+attributes and texts that actually changed are touched.
+"""
+
+from string import Template
+
+from pyscript.web import Element
+from virtual_dom import ELEMENT_NODE, RAW_TEXT_ELEMENTS, TEXT_NODE, VNode, render
+
+IFRAME_TEMPLATE: str = """<html>
+    <head>
+        <title>HTML Tutorial</title>
+    </head>
+    <body>
+        <div id="result">${RESULT}</div>
+    </body>
+</html>
+"""
+
+
+class Preview:
+    """An iframe displaying generated HTML."""
+
+    __slots__ = ("_shown", "frame")
+
+    def __init__(self, frame: Element) -> None:
+        self.frame = frame
+        # The children of the #result container as of the last update, or None if we don't know what's in there
+        self._shown: list[VNode | str] | None = None
+        self._load("")
+
+    def show(self, content: VNode | None) -> None:
+        """Display the given element in the preview, or nothing if it's None."""
+        new_children = [] if content is None else _normalize([content])
+        container = self._container()
+        if container is None:
+            self._load(render(*new_children))
+        elif self._shown is None:
+            container.innerHTML = render(*new_children)
+        else:
+            _patch(container, self._shown, new_children)
+        self._shown = new_children
+
+    def _load(self, result_html: str) -> None:
+        """Load a complete new document into the iframe."""
+        self.frame.setAttribute("srcdoc", Template(IFRAME_TEMPLATE).safe_substitute(RESULT=result_html))
+
+    def _container(self) -> Element | None:
+        """Get the #result container if the iframe's document has finished loading."""
+        document = self.frame.contentDocument
+        if document is None:
+            return None
+        return document.getElementById("result")
+
+
+def _normalize(children: list[VNode | str]) -> list[VNode | str]:
+    """Merge adjacent texts and drop empty ones, since that's what they turn into in the DOM."""
+    normalized: list[VNode | str] = []
+    for child in children:
+        if not isinstance(child, str):
+            normalized.append(child)
+        elif child and normalized and isinstance(normalized[-1], str):
+            normalized[-1] += child
+        elif child:
+            normalized.append(child)
+    return normalized
+
+
+def _corresponds(live_nodes: list[Element], children: list[VNode | str]) -> bool:
+    """Check whether the DOM nodes are the ones we got from rendering the given children.
+
+    This isn't always the case because the browser fixes up some invalid HTML while parsing it, e.g. by adding a
+    <tbody> to tables or moving text out of them.
+    """
+    if len(live_nodes) != len(children):
+        return False
+    for live_node, child in zip(live_nodes, children, strict=True):
+        if isinstance(child, str):
+            if live_node.nodeType != TEXT_NODE:
+                return False
+        elif live_node.nodeType != ELEMENT_NODE or live_node.localName != child.tag_name:
+            return False
+    return True
+
+
+def _patch_attributes(live_node: Element, old: VNode, new: VNode) -> None:
+    for name in old.attributes.keys() - new.attributes.keys():
+        live_node.removeAttribute(name)
+    for name, value in new.attributes.items():
+        if old.attributes.get(name) != value:
+            live_node.setAttribute(name, value)
+
+
+def _patch(container: Element, old_children: list[VNode | str], new_children: list[VNode | str]) -> None:
+    """Update the children of `container` from `old_children` to `new_children` with as few changes as possible.
+
+    Children are matched up by position. Whenever the DOM turns out not to look the way we rendered it, the affected
+    element's contents are replaced completely.
+    """
+    stack = [(container, old_children, new_children)]
+    while stack:
+        stack.extend(_patch_children(*stack.pop()))
+
+
+type _PendingPatch = tuple[Element, list[VNode | str], list[VNode | str]]
+
+
+def _patch_children(parent: Element, old: list[VNode | str], new: list[VNode | str]) -> list[_PendingPatch]:
+    """Update the direct children of `parent`, returning the child elements whose own children still need patching."""
+    if parent.localName in RAW_TEXT_ELEMENTS:
+        # The contents of <script> and <style> are plain text, which would be escaped by `render`
+        if old != new:
+            parent.textContent = "".join(new)
+        return []
+    live_nodes = list(parent.childNodes)
+    # Text nodes can't be replaced with HTML, so if a text turned into an element or the other way around, we
+    # re-render the parent's contents.
+    if not _corresponds(live_nodes, old) or any(
+        isinstance(old_child, str) != isinstance(new_child, str)
+        for old_child, new_child in zip(old, new, strict=False)
+    ):
+        parent.innerHTML = render(*new)
+        return []
+    pending = []
+    for live_node, old_child, new_child in zip(live_nodes, old, new, strict=False):
+        if isinstance(new_child, str):
+            if old_child != new_child:
+                live_node.data = new_child
+        elif old_child.tag_name != new_child.tag_name:
+            live_node.outerHTML = render(new_child)
+        else:
+            _patch_attributes(live_node, old_child, new_child)
+            pending.append((live_node, _normalize(old_child.children), _normalize(new_child.children)))
+    for live_node in live_nodes[len(new) :]:
+        live_node.remove()
+    if len(new) > len(old):
+        parent.insertAdjacentHTML("beforeend", render(*new[len(old) :]))
+    return pending
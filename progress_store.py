@@ -0,0 +1,128 @@
+"""Keeping the learner's progress across page loads.
+
+The progress (solved exercises, wrong attempts and the code drafts in the editor) is stored as a single JSON document
+in the browser's localStorage. It's read once when the page loads and kept in memory afterwards. Changes only update
+the in-memory copy and schedule a write, so that a burst of changes, like typing in the editor, is written in one go
+instead of one write per keystroke. Pending changes are also written when the page is left.
+"""
+
+import json
+from typing import Final
+
+from proxy_registry import ProxyScope
+from pyodide.ffi import JsException
+from pyodide.ffi.wrappers import add_event_listener
+from pyscript import window
+
+STORAGE_KEY: Final[str] = "html-tutorial-progress"
+
+# Bump this when the format of the stored progress changes incompatibly. Progress in other formats is ignored.
+STORAGE_VERSION: Final[int] = 1
+
+# How long changes are collected before the progress is written to storage
+WRITE_DELAY_MS: Final[int] = 1000
+
+
+def _local_storage() -> object | None:
+    """Get the browser's localStorage, or None if it isn't available (e.g. because the user disabled it)."""
+    try:
+        return window.localStorage
+    except JsException:
+        return None
+
+
+class ProgressStore:
+    """The learner's progress, keyed by exercise title."""
+
+    __slots__ = ("_proxies", "_storage", "_timer", "attempts", "drafts", "solved")
+
+    def __init__(self, storage: object | None) -> None:
+        self._storage = storage
+        self._timer: int | None = None
+        # Destroys the proxy of the pending write's timer when the write happens early
+        self._proxies = ProxyScope()
+        self.solved: set[str] = set()
+        self.attempts: dict[str, int] = {}
+        self.drafts: dict[str, str] = {}
+        self._load()
+
+    @classmethod
+    def open(cls) -> "ProgressStore":
+        """Open the store backed by localStorage, writing any pending changes when the page is left."""
+        store = cls(_local_storage())
+        add_event_listener(window, "pagehide", lambda _event: store.flush())
+        return store
+
+    def _load(self) -> None:
+        if self._storage is None:
+            return
+        stored = self._storage.getItem(STORAGE_KEY)
+        if stored is None:
+            return
+        try:
+            progress = json.loads(stored)
+        except json.JSONDecodeError:
+            print("Warning: Ignoring unreadable stored progress")
+            return
+        if not isinstance(progress, dict) or progress.get("version") != STORAGE_VERSION:
+            return
+        self.solved = set(progress.get("solved", []))
+        self.attempts = dict(progress.get("attempts", {}))
+        self.drafts = dict(progress.get("drafts", {}))
+
+    def mark_solved(self, title: str) -> None:
+        """Remember that the exercise has been solved."""
+        if title not in self.solved:
+            self.solved.add(title)
+            self._schedule_write()
+
+    def get_attempts(self, title: str) -> int:
+        """Get the number of wrong attempts at the exercise since it was last solved."""
+        return self.attempts.get(title, 0)
+
+    def set_attempts(self, title: str, attempts: int) -> None:
+        """Set the number of wrong attempts at the exercise."""
+        if self.get_attempts(title) == attempts:
+            return
+        if attempts:
+            self.attempts[title] = attempts
+        else:
+            del self.attempts[title]
+        self._schedule_write()
+
+    def get_draft(self, title: str) -> str:
+        """Get the code the learner last entered for the exercise."""
+        return self.drafts.get(title, "")
+
+    def set_draft(self, title: str, source: str) -> None:
+        """Remember the code the learner entered for the exercise."""
+        if self.get_draft(title) == source:
+            return
+        if source:
+            self.drafts[title] = source
+        else:
+            del self.drafts[title]
+        self._schedule_write()
+
+    def _schedule_write(self) -> None:
+        if self._storage is None or self._timer is not None:
+            return
+        self._timer = self._proxies.set_timeout(self.flush, WRITE_DELAY_MS)
+
+    def flush(self) -> None:
+        """Write pending changes to storage right away."""
+        if self._timer is None:
+            return
+        self._proxies.clear_timeout(self._timer)
+        self._timer = None
+        progress = {
+            "version": STORAGE_VERSION,
+            "solved": sorted(self.solved),
+            "attempts": self.attempts,
+            "drafts": self.drafts,
+        }
+        try:
+            self._storage.setItem(STORAGE_KEY, json.dumps(progress))
+        except JsException as err:
+            # Most likely the storage quota has been exceeded. The progress is still kept in memory.
+            print(f"Warning: Could not store progress: {err}")
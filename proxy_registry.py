@@ -0,0 +1,88 @@
+"""Keeping track of the JavaScript proxies created for Python functions.
+
+A proxy keeps its Python function (and everything the function references) alive until it's destroyed, so proxies
+that are no longer needed have to be destroyed explicitly, or memory grows for as long as the page is open. A
+`ProxyScope` creates the proxies for one part of the page and destroys all of them when it's closed. Proxies for
+timer callbacks are destroyed as soon as the timer has fired or been cancelled.
+"""
+
+from collections.abc import Callable
+
+from pyodide.ffi import create_once_callable, create_proxy
+from pyscript import window
+
+
+class _LiveProxies:
+    count: int = 0
+
+
+def live_proxy_count() -> int:
+    """Get the number of proxies created through a `ProxyScope` that haven't been destroyed yet."""
+    return _LiveProxies.count
+
+
+class ProxyScope:
+    """Owns the proxies created for one part of the page."""
+
+    __slots__ = ("_listeners", "_proxies", "_timers")
+
+    def __init__(self) -> None:
+        self._proxies: list[object] = []
+        self._listeners: list[tuple[object, str, object, bool]] = []
+        # Timer id -> the proxy of its callback
+        self._timers: dict[int, object] = {}
+
+    def proxy(self, function: Callable) -> object:
+        """Create a proxy for the function that lives until the scope is closed."""
+        proxy = create_proxy(function)
+        _LiveProxies.count += 1
+        self._proxies.append(proxy)
+        return proxy
+
+    def add_event_listener(
+        self,
+        target: object,
+        event: str,
+        listener: Callable,
+        *,
+        capture: bool = False,
+    ) -> None:
+        """Add an event listener that's removed when the scope is closed."""
+        proxy = self.proxy(listener)
+        target.addEventListener(event, proxy, capture)
+        self._listeners.append((target, event, proxy, capture))
+
+    def set_timeout(self, callback: Callable[[], None], delay_ms: int) -> int:
+        """Call the function after the delay and return the timer's id, which can be passed to `clear_timeout`."""
+
+        def run() -> None:
+            # The proxy destroys itself after this call
+            del self._timers[timer_id]
+            _LiveProxies.count -= 1
+            callback()
+
+        proxy = create_once_callable(run)
+        _LiveProxies.count += 1
+        timer_id = window.setTimeout(proxy, delay_ms)
+        self._timers[timer_id] = proxy
+        return timer_id
+
+    def clear_timeout(self, timer_id: int) -> None:
+        """Cancel a timer, unless it has already fired."""
+        window.clearTimeout(timer_id)
+        proxy = self._timers.pop(timer_id, None)
+        if proxy is not None:
+            proxy.destroy()
+            _LiveProxies.count -= 1
+
+    def close(self) -> None:
+        """Remove the event listeners, cancel the timers and destroy all proxies of the scope."""
+        for target, event, proxy, capture in self._listeners:
+            target.removeEventListener(event, proxy, capture)
+        self._listeners.clear()
+        for timer_id in list(self._timers):
+            self.clear_timeout(timer_id)
+        for proxy in self._proxies:
+            proxy.destroy()
+        _LiveProxies.count -= len(self._proxies)
+        self._proxies.clear()
@@ -0,0 +1,53 @@
+"""Addressing the views of the single-page app.
+
+`index.html` is the app's shell: the home page, the exercises page and each single exercise are views inside it,
+addressed by the URL's fragment, e.g. `#/exercises/2/3` for the third exercise of the second group. Navigating
+between them only changes the fragment, so the page and its Python interpreter stay in place, while links, bookmarks
+and the back and forward buttons work as usual. The fragment is used instead of the History API because the site is
+served by a static host, which can't answer arbitrary paths with the shell.
+"""
+
+from dataclasses import dataclass
+from typing import Final
+
+# The page name of index.html, the page hosting the views
+SHELL_PAGE_NAME: Final[str] = "home"
+EXERCISES_PAGE_NAME: Final[str] = "exercises"
+NOT_FOUND_PAGE_NAME: Final[str] = "404"
+# The number of parts of an exercise's route: exercises/<group number>/<exercise number>
+_EXERCISE_ROUTE_LENGTH: Final[int] = 3
+
+
+@dataclass(frozen=True)
+class Route:
+    """A view of the app, along with the exercise to show if it's the exercises page.
+
+    The indices are zero-based, while the fragment counts groups and exercises from 1, like the sidebar.
+    """
+
+    page_name: str
+    group_index: int | None = None
+    exercise_index: int | None = None
+
+
+def parse_route(fragment: str) -> Route:
+    """Get the route a URL fragment (including the leading #) points to. Unknown fragments lead to the 404 page."""
+    parts = fragment.removeprefix("#").strip("/").split("/")
+    if parts == [""]:
+        return Route(SHELL_PAGE_NAME)
+    if parts == [EXERCISES_PAGE_NAME]:
+        return Route(EXERCISES_PAGE_NAME)
+    if len(parts) == _EXERCISE_ROUTE_LENGTH and parts[0] == EXERCISES_PAGE_NAME:
+        numbers = [int(part) if part.isdecimal() else 0 for part in parts[1:]]
+        if all(number > 0 for number in numbers):
+            return Route(EXERCISES_PAGE_NAME, numbers[0] - 1, numbers[1] - 1)
+    return Route(NOT_FOUND_PAGE_NAME)
+
+
+def route_href(page_name: str, group_index: int | None = None, exercise_index: int | None = None) -> str:
+    """Get the fragment linking to a view of the shell."""
+    if page_name == SHELL_PAGE_NAME:
+        return "#/"
+    if group_index is None or exercise_index is None:
+        return f"#/{page_name}"
+    return f"#/{page_name}/{group_index + 1}/{exercise_index + 1}"
@@ -0,0 +1,72 @@
+// Caches the packaged app and the runtime it loads from CDNs, so repeat visits boot without the network.
+// This is a template: `package_app.py` fills in the version and the files to precache.
+
+const CACHE_NAME = "html-tutorial-${VERSION}";
+const PRECACHE_URLS = ${PRECACHE_URLS};
+
+self.addEventListener("install", (event) => {
+    event.waitUntil(
+        caches.open(CACHE_NAME)
+            .then((cache) => cache.addAll(PRECACHE_URLS))
+            .then(() => self.skipWaiting()),
+    );
+});
+
+self.addEventListener("activate", (event) => {
+    // Drop the caches of previous versions and take over pages that are already open, so the runtime they're
+    // about to load ends up in the cache on the very first visit.
+    event.waitUntil(
+        caches.keys()
+            .then((names) => Promise.all(names.filter((name) => name !== CACHE_NAME).map((name) => caches.delete(name))))
+            .then(() => self.clients.claim()),
+    );
+});
+
+// The pages, configs and the worker script keep their names between versions, so they're fetched from the network
+// when possible to pick up new versions. Everything else (the archive, PyScript, Pyodide, CodeMirror, fonts) has
+// versioned URLs and is served from the cache once it's in there.
+function isUnversioned(url) {
+    return url.origin === self.location.origin && (url.pathname.endsWith("/") || /\.(html|json|py)$/.test(url.pathname));
+}
+
+async function networkFirst(request) {
+    const cache = await caches.open(CACHE_NAME);
+    try {
+        const response = await fetch(request);
+        if (response.ok) {
+            cache.put(request, response.clone());
+        }
+        return response;
+    } catch (error) {
+        const cached = await cache.match(request);
+        if (cached) {
+            return cached;
+        }
+        throw error;
+    }
+}
+
+async function cacheFirst(request) {
+    const cache = await caches.open(CACHE_NAME);
+    const cached = await cache.match(request);
+    if (cached) {
+        return cached;
+    }
+    const response = await fetch(request);
+    if (response.ok || response.type === "opaque") {
+        cache.put(request, response.clone());
+    }
+    return response;
+}
+
+self.addEventListener("fetch", (event) => {
+    const request = event.request;
+    if (request.method !== "GET") {
+        return;
+    }
+    const url = new URL(request.url);
+    if (url.protocol !== "http:" && url.protocol !== "https:") {
+        return;
+    }
+    event.respondWith(isUnversioned(url) ? networkFirst(request) : cacheFirst(request));
+});
@@ -1,21 +1,199 @@
-import re
+from collections.abc import Callable
+from functools import partial
+from typing import Final, Self
 from xml.etree import ElementTree as ET
 
-from html_helpers import div
-from pyscript.web import Element
+from html_helpers import Element, div
+from virtual_dom import VNode
 
+WILDCARD: Final[str] = "{{*}}"
 
-def validate_solution(expected: str, actual: Element) -> tuple[bool, Element]:
+
+class _TextPattern:
+    """A text template in which `{{*}}` matches any text, split once into the literal texts around the wildcards."""
+
+    __slots__ = ("segments", "template")
+
+    def __init__(self, template: str) -> None:
+        self.template = template
+        self.segments = template.split(WILDCARD)
+
+    def matches(self, text: str) -> bool:
+        """Check whether the text matches the template.
+
+        The first and last segment have to be at the start and the end of the text. Every other segment is matched at
+        its first occurrence after the previous one. Taking the earliest occurrence never rules out a match for the
+        segments after it, so there's no need to backtrack and the text is only scanned once.
+        """
+        if len(self.segments) == 1:
+            return text == self.template
+        first, *middle, last = self.segments
+        end = len(text) - len(last)
+        if end < len(first) or not text.startswith(first) or not text.endswith(last):
+            return False
+        position = len(first)
+        for segment in middle:
+            position = text.find(segment, position, end)
+            if position == -1:
+                return False
+            position += len(segment)
+        return True
+
+
+# A JSON-compatible representation of a parsed template element: [tag, attributes, text, tail, children]
+type TemplateData = list
+
+
+class _ElementTemplate:
+    """A pre-parsed element of an answer template."""
+
+    __slots__ = ("attributes", "children", "tag", "tail", "text")
+
+    def __init__(
+        self,
+        tag: str,
+        attributes: dict[str, str],
+        text: str | None,
+        tail: str | None,
+        children: list["_ElementTemplate"],
+    ) -> None:
+        self.tag = tag
+        self.attributes = attributes
+        self.text = _compile_text(text)
+        self.tail = _compile_text(tail)
+        self.children = children
+
+    # Like the matching, these walk the tree with an explicit stack instead of recursing, see `_matches_xml_template`
+
+    @classmethod
+    def from_xml(cls, root_element: ET.Element) -> Self:
+        root = cls(root_element.tag, dict(root_element.attrib), root_element.text, root_element.tail, [])
+        pending = [(root_element, root)]
+        while pending:
+            element, template = pending.pop()
+            for child in element:
+                child_template = cls(child.tag, dict(child.attrib), child.text, child.tail, [])
+                template.children.append(child_template)
+                pending.append((child, child_template))
+        return root
+
+    @classmethod
+    def from_data(cls, root_data: TemplateData) -> Self:
+        root = cls(*root_data[:4], [])
+        pending = [(root_data, root)]
+        while pending:
+            data, template = pending.pop()
+            for child_data in data[4]:
+                child_template = cls(*child_data[:4], [])
+                template.children.append(child_template)
+                pending.append((child_data, child_template))
+        return root
+
+    def to_data(self) -> TemplateData:
+        root_data = self.shallow_data()
+        pending = [(self, root_data)]
+        while pending:
+            template, data = pending.pop()
+            for child in template.children:
+                child_data = child.shallow_data()
+                data[4].append(child_data)
+                pending.append((child, child_data))
+        return root_data
+
+    def shallow_data(self) -> TemplateData:
+        """Get the representation of the element without its children."""
+        text = None if self.text is None else self.text.template
+        tail = None if self.tail is None else self.tail.template
+        return [self.tag, self.attributes, text, tail, []]
+
+
+def _compile_text(template: str | None) -> _TextPattern | None:
+    return None if template is None else _TextPattern(template)
+
+
+class AnswerTemplate:
+    """An exercise's expected answer, parsed and compiled once so that it can be matched against many submissions."""
+
+    __slots__ = ("root",)
+
+    def __init__(self, expected: str | None = None, data: TemplateData | None = None) -> None:
+        """Compile a template, either from its source or from the pre-parsed representation created by `to_data`."""
+        if data is not None:
+            self.root = _ElementTemplate.from_data(data)
+        else:
+            # The generated HTML will always have a plain <div> wrapped around it because of how we create it. So we
+            # likewise add a <div> around the expected HTML.
+            self.root = _ElementTemplate.from_xml(ET.fromstring(f"<div>{expected}</div>"))
+
+    def to_data(self) -> TemplateData:
+        """Get a JSON-compatible representation of the parsed template."""
+        return self.root.to_data()
+
+    def match(self, actual: VNode) -> "_Result":
+        """Match the given output against the template, returning an element describing the error if it doesn't."""
+        return _matches_xml_template(self.root, actual)
+
+
+class _ActualElement:
+    """A view of a generated element in the same shape as the template it's matched against.
+
+    The element is read directly from the `VNode`, so the output doesn't have to be serialized and parsed again. Like
+    in an `ET.Element`, `text` is the text before the first child element and each child comes with its tail, the
+    text between it and the next child element. Empty texts are None.
+    """
+
+    __slots__ = ("attributes", "children", "tag", "text")
+
+    def __init__(self, node: VNode) -> None:
+        self.tag: str = node.tag_name
+        self.attributes: dict[str, str] = node.attributes
+        self.text: str | None = None
+        self.children: list[tuple[VNode, str | None]] = []
+        texts: list[str] = []
+        for child in node.children:
+            if isinstance(child, str):
+                texts.append(child)
+                continue
+            self._end_text(texts)
+            self.children.append((child, None))
+        self._end_text(texts)
+
+    def _end_text(self, texts: list[str]) -> None:
+        """Assign the text collected so far to the element's text or the tail of the last child."""
+        text = "".join(texts) or None
+        texts.clear()
+        if not self.children:
+            self.text = text
+        else:
+            self.children[-1] = (self.children[-1][0], text)
+
+
+_compiled_templates: dict[str, AnswerTemplate] = {}
+
+
+def compile_template(expected: str, data: TemplateData | None = None) -> AnswerTemplate:
+    """Get the compiled version of an exercise's answer template.
+
+    Templates are compiled the first time a solution for them is submitted and then kept for the rest of the session.
+    If the pre-parsed template is given, it's used instead of parsing the template again.
+    """
+    template = _compiled_templates.get(expected)
+    if template is None:
+        template = _compiled_templates[expected] = AnswerTemplate(expected, data)
+    return template
+
+
+def validate_solution(
+    expected: str,
+    actual: VNode,
+    expected_data: TemplateData | None = None,
+) -> tuple[bool, Element]:
     """Validate HTML output against expected template.
 
     The template should be a string containing the expected XML structure and can contain `{{*}}` as a wildcard that
-    can match any text (but not tags).
+    can match any text (but not tags). `expected_data` optionally is the pre-parsed template from the exercise bundle.
     """
-    # The generated HTML will always have a plain <div> wrapped around it because of how we create it. So we likewise
-    # add a <div> around the expected HTML.
-    expected_tree = ET.fromstring(f"<div>{expected}</div>")
-    actual_tree = ET.fromstring(actual.outerHTML)
-    error = _matches_xml_template(expected_tree, actual_tree)
+    error = compile_template(expected, expected_data).match(actual)
     if error is None:
         return True, div("✅ Output matches", style="color:green; font-weight:bold;")
     return False, error
@@ -23,69 +201,85 @@ def validate_solution(expected: str, actual: Element) -> tuple[bool, Element]:
 
 # The following methods return None if there was no error, otherwise an HTML element displaying the error message
 type _Result = Element | None
+# The checks that still have to be done, the next one last
+type _PendingChecks = list[Callable[[], _Result]]
 
 
 def _test_failure_div(message: str) -> Element:
     return div(f"❌ {message}", style="color:red; font-weight:bold;")
 
 
-def _matches_xml_template(expected: ET.Element, actual: ET.Element) -> _Result:
+def _matches_xml_template(expected: _ElementTemplate, actual: VNode) -> _Result:
+    """Match the generated tree against the template, stopping at the first mismatch.
+
+    Instead of recursing into the children, the checks still to be done are kept on an explicit stack, so deeply
+    nested output can't overflow the call stack, which is a lot smaller in Pyodide than in CPython. The checks are done
+    in the same order as by a recursive walk.
+    """
+    pending: _PendingChecks = []
+    pending.append(partial(_compare_element, expected, actual, pending))
+    while pending:
+        error = pending.pop()()
+        if error is not None:
+            return error
+    return None
+
+
+def _compare_element(expected: _ElementTemplate, node: VNode, pending: _PendingChecks) -> _Result:
+    """Compare an element's tag, attributes and text, and schedule the comparison of its children."""
+    actual = _ActualElement(node)
     if expected.tag != actual.tag:
         return _test_failure_div(f"Expected a <{expected.tag}> tag, but got <{actual.tag}>")
     error = _compare_attributes(expected, actual)
     if error is not None:
         return error
-    error = _compare_children(expected, actual)
+    error = _matches_text(expected.text, actual.text)
     if error is not None:
         return error
+    # Pushed in reverse, so that each child is compared (including its descendants) before its tail, the children
+    # are compared in order and the number of children is only checked once all existing pairs have matched.
+    pending.append(partial(_compare_child_count, expected, actual))
+    children = zip(expected.children, actual.children, strict=False)
+    for expected_child, (actual_child, actual_tail) in reversed(list(children)):
+        pending.append(partial(_matches_text, expected_child.tail, actual_tail))
+        pending.append(partial(_compare_element, expected_child, actual_child, pending))
     return None
 
 
-def _compare_attributes(expected: ET.Element, actual: ET.Element) -> _Result:
-    for attribute_name, attribute_value in actual.attrib.items():
-        if attribute_name not in expected.attrib:
+def _compare_attributes(expected: _ElementTemplate, actual: _ActualElement) -> _Result:
+    for attribute_name, attribute_value in actual.attributes.items():
+        if attribute_name not in expected.attributes:
             return _test_failure_div(f"Unexpected attribute {attribute_name}")
-        expected_value = expected.attrib[attribute_name]
+        expected_value = expected.attributes[attribute_name]
         if attribute_value != expected_value:
             return _test_failure_div(
                 f"Attribute {attribute_name} is set to {attribute_value}, expected {expected_value}",
             )
-    for attribute_name in expected.attrib:
-        if attribute_name not in actual.attrib:
+    for attribute_name in expected.attributes:
+        if attribute_name not in actual.attributes:
             return _test_failure_div(f"Missing attribute {attribute_name}")
     return None
 
 
-def _compare_children(expected: ET.Element, actual: ET.Element) -> _Result:
-    error = _matches_text(expected.text, actual.text)
-    if error is not None:
-        return error
-    for expected_child, actual_child in zip(expected, actual, strict=False):
-        error = _matches_xml_template(expected_child, actual_child)
-        if error is not None:
-            return error
-        error = _matches_text(expected_child.tail, actual_child.tail)
-        if error is not None:
-            return error
-    if len(actual) > len(expected):
-        extra_element = actual[len(expected)]
+def _compare_child_count(expected: _ElementTemplate, actual: _ActualElement) -> _Result:
+    if len(actual.children) > len(expected.children):
+        extra_element = _ActualElement(actual.children[len(expected.children)][0])
         return _test_failure_div(f"Unexpected <{extra_element.tag}> element")
-    if len(expected) > len(actual):
-        missing_element = expected[len(actual)]
+    if len(expected.children) > len(actual.children):
+        missing_element = expected.children[len(actual.children)]
         return _test_failure_div(f"Missing <{missing_element.tag}> element")
     return None
 
 
-def _matches_text(expected: str | None, actual: str | None) -> _Result:
+def _matches_text(expected: _TextPattern | None, actual: str | None) -> _Result:
     if expected is None and actual is None:
         return None
     if expected is None:
         return _test_failure_div(f"Unexpected text '{actual}'")
     if actual is None:
-        if expected == "{{*}}":
+        if expected.template == WILDCARD:
             return None
-        return _test_failure_div(f"Missing text '{expected}'")
-    expected_regex = expected.replace("{{*}}", ".*")
-    if re.fullmatch(expected_regex, actual) is None:
-        return _test_failure_div(f"Text '{actual}' did not match the expected pattern '{expected}'")
+        return _test_failure_div(f"Missing text '{expected.template}'")
+    if not expected.matches(actual):
+        return _test_failure_div(f"Text '{actual}' did not match the expected pattern '{expected.template}'")
     return None
@@ -0,0 +1,167 @@
+"""Measuring where the time goes while the page starts up.
+
+Every phase is recorded as a `performance.measure` entry whose name starts with `html-tutorial:`, so it shows up in
+the browser's performance tools. What happens before our Python code runs (downloading Pyodide, fetching the files
+from `pyscript.json`) is reconstructed from the browser's resource timings. Once the page is ready, the timeline is
+published as JSON in `window.htmlTutorialStartupTimeline`, where it can be read by scripts comparing releases.
+Opening a page with `?timeline` in its URL also shows it in an overlay. Phases that end after the page is ready, like
+building a view the first time it's opened, are added to the published timeline as they end.
+
+Until the first phase has started, this module only imports the standard library and Pyodide's built-in `js` module,
+so that the time spent importing our other modules is part of the "imports" phase. Everything else is imported where
+it's needed.
+"""
+
+import json
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import ClassVar, Final
+from urllib.parse import parse_qs
+
+# The JavaScript global scope, i.e. `pyscript.window` without importing PyScript
+import js as window
+
+MEASURE_PREFIX: Final[str] = "html-tutorial:"
+OVERLAY_QUERY_PARAMETER: Final[str] = "timeline"
+TIMELINE_GLOBAL: Final[str] = "htmlTutorialStartupTimeline"
+OVERLAY_ID: Final[str] = "startup-timeline"
+
+# Same-origin files fetched before our code runs: the files from pyscript.json, main.py or the packaged archive
+_FETCHED_FILE_SUFFIXES: Final[tuple[str, ...]] = (".py", ".json", ".zip")
+
+
+@dataclass
+class Phase:
+    """A phase of the startup, with times in milliseconds since the navigation started."""
+
+    name: str
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        """How long the phase took, in milliseconds."""
+        return self.end - self.start
+
+
+class _Timeline:
+    phases: ClassVar[list[Phase]] = []
+    started: ClassVar[dict[str, float]] = {}
+    # Whether the timeline has been published by `finish`
+    finished: bool = False
+
+
+def start(name: str) -> None:
+    """Mark the start of a phase."""
+    window.performance.mark(f"{MEASURE_PREFIX}{name}:start")
+    _Timeline.started[name] = window.performance.now()
+
+
+def end(name: str) -> None:
+    """Mark the end of a phase that was started with `start`."""
+    start_mark = f"{MEASURE_PREFIX}{name}:start"
+    end_mark = f"{MEASURE_PREFIX}{name}:end"
+    window.performance.mark(end_mark)
+    window.performance.measure(f"{MEASURE_PREFIX}{name}", start_mark, end_mark)
+    _Timeline.phases.append(Phase(name, _Timeline.started.pop(name), window.performance.now()))
+    if _Timeline.finished:
+        _publish()
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Measure the code in the with block as a phase."""
+    start(name)
+    try:
+        yield
+    finally:
+        end(name)
+
+
+def _record(name: str, start_time: float, end_time: float) -> None:
+    """Record a phase whose times are already known."""
+    from pyodide.ffi import to_js  # noqa: PLC0415
+
+    options = to_js({"start": start_time, "end": end_time}, dict_converter=window.Object.fromEntries)
+    window.performance.measure(f"{MEASURE_PREFIX}{name}", options)
+    _Timeline.phases.append(Phase(name, start_time, end_time))
+
+
+def _record_span(name: str, resources: list) -> None:
+    """Record the time from the first of the resources being requested until the last one has arrived."""
+    if resources:
+        _record(name, min(r.startTime for r in resources), max(r.responseEnd for r in resources))
+
+
+def _record_boot(python_started: float) -> None:
+    """Record what happened before our Python code started running."""
+    _record("boot", 0, python_started)
+    resources = [r for r in window.performance.getEntriesByType("resource") if r.startTime < python_started]
+    _record_span("runtime-download", [r for r in resources if "pyodide" in r.name])
+    origin = window.location.origin
+    _record_span(
+        "fetch-files",
+        [r for r in resources if r.name.startswith(origin) and r.name.split("?")[0].endswith(_FETCHED_FILE_SUFFIXES)],
+    )
+
+
+def to_json() -> str:
+    """Get the recorded phases, ordered by their start, as JSON."""
+    phases = sorted(_Timeline.phases, key=lambda phase: phase.start)
+    return json.dumps(
+        {
+            "page": window.location.pathname,
+            "phases": [
+                {"name": phase.name, "start": round(phase.start, 1), "duration": round(phase.duration, 1)}
+                for phase in phases
+            ],
+        },
+    )
+
+
+def _overlay(timeline_json: str) -> None:
+    from html_helpers import _virtual_nodes, b, button, div, table, td, tr  # noqa: PLC0415
+    from virtual_dom import mount  # noqa: PLC0415
+
+    document = window.document
+    previous_overlay = document.getElementById(OVERLAY_ID)
+    if previous_overlay is not None:
+        previous_overlay.remove()
+    with _virtual_nodes():
+        rows = [
+            tr(td(phase["name"]), td(f"{phase['start']:.1f} ms"), td(b(f"{phase['duration']:.1f} ms")))
+            for phase in json.loads(timeline_json)["phases"]
+        ]
+        overlay = div(
+            b("Startup timeline"),
+            table(*rows, style="border-spacing: 1em 0.2em; margin: 0 -1em;"),
+            button(
+                "Copy JSON",
+                onclick=f"copyToClipboard(window.{TIMELINE_GLOBAL}, () => {{ this.textContent = 'Copied'; }})",
+            ),
+            style="position: fixed; bottom: 1em; right: 1em; z-index: 1000; padding: 0.5em 1em;"
+            "background-color: rgba(0, 0, 0, 0.8); color: white; font: 0.8rem monospace; border-radius: 0.5em;",
+            id=OVERLAY_ID,
+        )
+    mount(document.body, overlay)
+
+
+def finish() -> None:
+    """Record the phases before our code started running and publish the timeline, now that the page is ready."""
+    python_started = min(phase.start for phase in _Timeline.phases)
+    _record_boot(python_started)
+    _record("startup", 0, window.performance.now())
+    _Timeline.finished = True
+    _publish()
+
+
+def _publish() -> None:
+    timeline_json = to_json()
+    setattr(window, TIMELINE_GLOBAL, timeline_json)
+    if OVERLAY_QUERY_PARAMETER in parse_qs(window.location.search.removeprefix("?"), keep_blank_values=True):
+        _overlay(timeline_json)
+
+
+# main.py imports this module before anything else, so this is (about) when our own code starts running
+start("imports")
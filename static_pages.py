@@ -0,0 +1,143 @@
+"""The parts of the pages that are the same on every visit.
+
+These are built by the same helpers as the rest of the page, so they can either be created by `main.py` in the browser
+or pre-rendered into the HTML files by `prerender.py`, which lets them show up before Python has started.
+"""
+
+from collections.abc import Callable
+from typing import Final
+
+from element_components import custom_code_block, custom_nav
+from html_helpers import Element, _tag, a, b, div, h1, h2, hr, i, p
+from router import SHELL_PAGE_NAME, route_href
+
+# The id of the element containing the static part of a page's body. If it's already there when main.py starts, the
+# page has been pre-rendered.
+STATIC_CONTENT_ID: Final[str] = "static-content"
+
+
+def head_elements() -> list[Element]:
+    """Create the styles and scripts that every page adds to its <head>."""
+    return [
+        _tag(
+            "style",
+            "@import url('https://fonts.googleapis.com/css2?family=Bricolage+Grotesque:opsz,wght@12..96,200..800&family"
+            "=Google+Sans"
+            "+Code:ital,wght@0,300..800;1,300..800&display=swap');"
+            "body {font-family: 'Bricolage Grotesque', sans-serif;}"
+            ".cm-editor, .CodeMirror {font-family: 'Google Sans Code', monospace;}"
+            ".exercise-link {text-decoration: none;} .exercise-link:hover {text-decoration: underline;}",
+        ),
+        _tag(
+            "script",
+            """
+function copyToClipboard(text, callback=()=>{}) {
+    navigator.clipboard.writeText(text).then(() => {
+        if (callback) callback();
+    });
+}
+""",
+        ),
+    ]
+
+
+def not_found_page(base_url: str = "") -> Element:
+    """Create the contents of the 404 page, linking to the home page at the shell's URL."""
+    return div(
+        h1("404 Not Found"),
+        p("The page you are looking for does not exist."),
+        a(
+            "Go back to Home",
+            href=base_url + route_href(SHELL_PAGE_NAME),
+            style="color: blue; text-decoration: none;",
+            onmouseover="this.style.textDecoration = 'underline';",
+            onmouseleave="this.style.textDecoration = 'none';",
+        ),
+        style="text-align: center; margin-top: 2em;",
+    )
+
+
+def home_page() -> Element:
+    """Create the contents of the home page."""
+    return div(
+        h1("About this Project", style="margin:0;"),
+        p(
+            "This project was created as part of ",
+            b("Python Code Jam 2025"),
+            ", where the theme was ",
+            i("Wrong Tool for the Job"),
+            ".",
+            style="margin: 0.5em 0 1em 0;",
+        ),
+        hr(),
+        h2("The Idea", style="margin:1em 0 0 0;"),
+        p(
+            "Our entry takes the form of an ",
+            b("HTML Tutorial"),
+            " but with a twist. Instead of writing HTML, user write ",
+            b("Python code"),
+            " to complete each exercise. For example, rather than typing:",
+            style="margin: 0.5em 0 1em 0;",
+        ),
+        custom_code_block("<div>Hello <em>World</em>!</div>", language="html"),
+        p("the user writes:"),
+        custom_code_block('div("Hello ", em("World"), "!")', language="python"),
+        p(
+            "The Python is then executed directly in the browser to generate the HTML, which is "
+            "displayed alongside the code editor. Each chapter introduces a new HTML concept, "
+            "followed by exercises that can only be solved by writing Python that outputs the "
+            "correct HTML structure.",
+        ),
+        hr(),
+        h2("Why This Fits the Theme", style="margin:1em 0 0 0;"),
+        p(
+            "At its core, the project is about teaching HTML, but we're doing it with Python, arguably the "
+            "wrong tool for the job. This mismatch captures the spirit of the Code Jam's theme while also "
+            'making for an engaging, "playful" learning experience.',
+            style="margin: 0.5em 0 0.5em 0;",
+        ),
+        p(
+            "It's also a fun exploration of ",
+            b('"Python in the browser"'),
+            ". Everything-tutorial logic, code execution, and validation-is written in Python. The user writes "
+            "Python, the site runs Python, and all of it ultimately produces HTML (Plus CSS and JavaScript).",
+            style="margin: 0.5em 0 1em 0;",
+        ),
+        hr(),
+        custom_code_block(
+            "• @psyklopps42 (Sebastian)",
+            "• @kcatloaf (Granth)",
+            "• @0w3n (Owen)",
+            "• @AMK (Amen Ellah)",
+            "• @kuro (Mohammad)",
+            language="authors",
+            copy_tip="none",
+        ),
+        style="display:flex; flex-direction:column; max-width: 70vw; margin: 2em auto 2em auto;"
+        "background-color:#eeeeee; padding: 2em; border-radius: 1em; "
+        "box-shadow: rgba(60, 64, 67, 0.3) 0px 1px 2px 0px, rgba(60, 64, 67, 0.15) 0px 2px 6px 2px;",
+    )
+
+
+# The views that consist of nothing but static content, by page name. Pages with unknown names show the 404 page.
+STATIC_PAGES: Final[dict[str, Callable[[], Element]]] = {"home": home_page}
+
+
+def view_id(page_name: str) -> str:
+    """Get the id of the element holding the view of a page."""
+    return f"view-{page_name}"
+
+
+def page_view(page_name: str, base_url: str = "") -> Element:
+    """Create the view of a static page, which `main.py` shows or hides when navigating in the shell."""
+    page = STATIC_PAGES[page_name]() if page_name in STATIC_PAGES else not_found_page(base_url)
+    return div(page, id=view_id(page_name), **{"data-view": page_name})
+
+
+def page_body(page_name: str) -> Element:
+    """Create the static part of a page's body: the navigation bar, followed by the page's view.
+
+    Only the shell's views are shown without leaving the page. The links on other pages lead to the shell.
+    """
+    base_url = "" if page_name == SHELL_PAGE_NAME else "./"
+    return div(custom_nav(base_url), page_view(page_name, base_url), id=STATIC_CONTENT_ID)
@@ -0,0 +1,112 @@
+"""Timing the stages of processing a submission.
+
+Code that is part of a submission wraps its stages in `stage(...)`. While a submission is being timed, the time spent
+in each stage is added up and, once the submission is done, recorded per exercise. Only the most recent submissions
+are kept, and the percentiles are only computed when a report is requested. Outside of a timed submission, e.g. when
+the live preview runs the code, `stage` does nothing besides checking whether a submission is being timed.
+"""
+
+import json
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import ClassVar, Final
+
+from html_helpers import _virtual_nodes, b, button, div, table, td, tr
+from virtual_dom import VNode
+
+# How many submissions per exercise the statistics are based on
+WINDOW_SIZE: Final[int] = 100
+
+# The stages in the order in which they happen. The compile and exec stages are part of the execute stage and are
+# only measured when the code runs on the main thread.
+STAGES: Final[list[str]] = ["execute", "compile", "exec", "validate", "hints", "preview", "total"]
+
+# The durations of the stages of the submission that's currently being timed, in milliseconds
+_current: ContextVar[dict[str, float] | None] = ContextVar("_current", default=None)
+
+
+class _Samples:
+    # Exercise title -> stage -> durations of the stage in the most recent submissions
+    by_exercise: ClassVar[dict[str, dict[str, deque[float]]]] = {}
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Measure the time spent in the with block as part of the given stage of the current submission."""
+    durations = _current.get()
+    if durations is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        durations[name] = durations.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+@contextmanager
+def submission(exercise_title: str) -> Iterator[None]:
+    """Time the stages of a submission for the given exercise. Use in the task that processes the submission."""
+    durations: dict[str, float] = {}
+    token = _current.set(durations)
+    try:
+        with stage("total"):
+            yield
+    finally:
+        _current.reset(token)
+        samples = _Samples.by_exercise.setdefault(exercise_title, {})
+        for name, duration in durations.items():
+            samples.setdefault(name, deque(maxlen=WINDOW_SIZE)).append(duration)
+
+
+def _percentile(sorted_samples: list[float], percent: int) -> float:
+    """Get the given percentile using the nearest-rank method."""
+    rank = max(1, -(-len(sorted_samples) * percent // 100))
+    return sorted_samples[rank - 1]
+
+
+def report() -> dict[str, dict[str, dict[str, float]]]:
+    """Get the number of samples, p50, p95 and maximum in milliseconds of every stage of every exercise."""
+    result = {}
+    for exercise_title, samples in _Samples.by_exercise.items():
+        result[exercise_title] = {}
+        for name in STAGES:
+            if name not in samples:
+                continue
+            ordered = sorted(samples[name])
+            result[exercise_title][name] = {
+                "count": len(ordered),
+                "p50": round(_percentile(ordered, 50), 2),
+                "p95": round(_percentile(ordered, 95), 2),
+                "max": round(ordered[-1], 2),
+            }
+    return result
+
+
+def report_json() -> str:
+    """Get the report as JSON."""
+    return json.dumps(report(), indent=2)
+
+
+def timing_panel(exercise_title: str, copy_report: str) -> VNode:
+    """Create a panel showing the statistics of an exercise, with a button running the given JavaScript to copy."""
+    stats = report().get(exercise_title, {})
+    with _virtual_nodes():
+        header = tr(*[td(b(text)) for text in ["stage", "n", "p50", "p95", "max"]])
+        rows = [
+            tr(
+                td(name),
+                td(str(stage_stats["count"])),
+                *[td(f"{stage_stats[key]:.2f} ms") for key in ["p50", "p95", "max"]],
+            )
+            for name, stage_stats in stats.items()
+        ]
+        return div(
+            b(f"Submission timings: {exercise_title}"),
+            table(header, *rows, style="border-spacing: 1em 0.2em; margin: 0 -1em;") if rows else div("No data yet"),
+            button("Copy report", onclick=copy_report),
+            style="font: 0.8rem monospace; background-color: #eee; padding: 0.5em; margin-top: 0.5em;",
+        )
@@ -0,0 +1,29 @@
+import sys
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+from tests.fakes import FakeJsException, FakeOnceCallable, FakeProxy, FakeWindow
+
+# Our modules that import the browser APIs, which the `window` fixture makes import the fakes
+_BROWSER_MODULES: tuple[str, ...] = ("progress_store", "proxy_registry")
+
+
+@pytest.fixture
+def window(monkeypatch: pytest.MonkeyPatch) -> FakeWindow:
+    """Provide fakes of the browser modules, which the modules using them are imported with."""
+    window = FakeWindow()
+    ffi = ModuleType("pyodide.ffi")
+    ffi.create_proxy = FakeProxy
+    ffi.create_once_callable = FakeOnceCallable
+    ffi.JsException = FakeJsException
+    wrappers = ModuleType("pyodide.ffi.wrappers")
+    wrappers.add_event_listener = lambda target, event, listener: target.addEventListener(event, listener, False)  # noqa: FBT003
+    monkeypatch.setitem(sys.modules, "pyodide", SimpleNamespace(ffi=ffi))
+    monkeypatch.setitem(sys.modules, "pyodide.ffi", ffi)
+    monkeypatch.setitem(sys.modules, "pyodide.ffi.wrappers", wrappers)
+    monkeypatch.setitem(sys.modules, "pyscript", SimpleNamespace(window=window))
+    # Imported again by each test, with the fakes
+    for module in _BROWSER_MODULES:
+        monkeypatch.delitem(sys.modules, module, raising=False)
+    return window
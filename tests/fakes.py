@@ -0,0 +1,73 @@
+"""Fakes of the browser APIs, for testing the modules that use them outside of the browser."""
+
+from collections.abc import Callable
+
+
+class FakeJsException(Exception):  # noqa: N818
+    """Stands in for `pyodide.ffi.JsException`."""
+
+
+class FakeProxy:
+    """Stands in for a Pyodide proxy of a Python function."""
+
+    def __init__(self, function: Callable) -> None:
+        self.function = function
+        self.destroyed = False
+
+    def __call__(self, *args: object) -> object:
+        """Call the function."""
+        return self.function(*args)
+
+    def destroy(self) -> None:
+        """Release the proxy, which must not have been released before."""
+        assert not self.destroyed
+        self.destroyed = True
+
+
+class FakeOnceCallable(FakeProxy):
+    """Stands in for a proxy created with `create_once_callable`, which destroys itself after its call."""
+
+    def __call__(self, *args: object) -> object:
+        """Call the function and release the proxy."""
+        result = super().__call__(*args)
+        self.destroy()
+        return result
+
+
+class FakeEventTarget:
+    """Stands in for a DOM element or the window, recording its event listeners."""
+
+    def __init__(self) -> None:
+        self.listeners: list[tuple[str, object, bool]] = []
+
+    def addEventListener(self, event: str, listener: object, capture: bool) -> None:  # noqa: N802, FBT001
+        """Record the listener."""
+        self.listeners.append((event, listener, capture))
+
+    def removeEventListener(self, event: str, listener: object, capture: bool) -> None:  # noqa: N802, FBT001
+        """Forget the listener, which must have been added."""
+        self.listeners.remove((event, listener, capture))
+
+
+class FakeWindow(FakeEventTarget):
+    """Stands in for the window, whose timers only fire when a test fires them."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.timers: dict[int, FakeProxy] = {}
+        self._next_timer_id = 1
+
+    def setTimeout(self, callback: FakeProxy, _delay_ms: int) -> int:  # noqa: N802
+        """Record the timer without starting it."""
+        timer_id = self._next_timer_id
+        self._next_timer_id += 1
+        self.timers[timer_id] = callback
+        return timer_id
+
+    def clearTimeout(self, timer_id: int) -> None:  # noqa: N802
+        """Forget the timer, if it has not fired yet."""
+        self.timers.pop(timer_id, None)
+
+    def fire(self, timer_id: int) -> None:
+        """Call a timer's callback, as if its delay had passed."""
+        self.timers.pop(timer_id)()
@@ -0,0 +1,33 @@
+import shutil
+import sys
+from pathlib import Path
+
+import bundle_exercises
+import pytest
+
+
+def _run(monkeypatch: pytest.MonkeyPatch, *args: str) -> None:
+    monkeypatch.setattr(sys, "argv", ["bundle_exercises.py", *args])
+    bundle_exercises.main()
+
+
+def test_check_passes_for_committed_bundle(monkeypatch: pytest.MonkeyPatch) -> None:
+    _run(monkeypatch, "--check")
+
+
+def test_check_fails_for_outdated_bundle(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    bundle = tmp_path / "bundle"
+    shutil.copytree(bundle_exercises.DEFAULT_BUNDLE_DIRECTORY, bundle)
+    (bundle / "index.json").write_text('{"exerciseGroups": []}\n', encoding="utf-8")
+    with pytest.raises(SystemExit) as exit_info:
+        _run(monkeypatch, "--check", "--output", str(bundle))
+    assert exit_info.value.code == 1
+
+
+def test_check_passes_after_build(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    bundle = tmp_path / "bundle"
+    _run(monkeypatch, "--output", str(bundle))
+    _run(monkeypatch, "--check", "--output", str(bundle))
+    (bundle / "stale.json").write_text("{}\n", encoding="utf-8")
+    with pytest.raises(SystemExit):
+        _run(monkeypatch, "--check", "--output", str(bundle))
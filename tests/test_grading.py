@@ -0,0 +1,51 @@
+import io
+import json
+
+from grading import grade_submissions
+
+ENDLESS_LOOP = "def spin():\n    while True:\n        pass\n\nspin()"
+
+
+def _grade(*sources: str, timeout: float) -> list[dict]:
+    submissions = [
+        json.dumps({"id": index, "exercise": "Paragraph Tag <p>", "source": source})
+        for index, source in enumerate(sources)
+    ]
+    output = io.StringIO()
+    grade_submissions(submissions, output, workers=1, timeout=timeout)
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_endless_loop_is_stopped() -> None:
+    verdicts = _grade(ENDLESS_LOOP, 'p("after the loop")', timeout=0.5)
+    assert [verdict["verdict"] for verdict in verdicts] == ["error", "pass"]
+    assert verdicts[0]["message"] == "The code took longer than 0.5 seconds to run and was stopped"
+
+
+def test_endless_loop_catching_exceptions_is_stopped() -> None:
+    source = (
+        "def spin():\n"
+        "    while True:\n"
+        "        try:\n"
+        "            pass\n"
+        "        except Exception:\n"
+        "            pass\n"
+        "\n"
+        "spin()"
+    )
+    [verdict] = _grade(source, timeout=0.5)
+    assert verdict["verdict"] == "error"
+
+
+def test_unparsable_answer_template_is_an_error() -> None:
+    submissions = [
+        json.dumps({"id": 1, "exercise": "Paragraph Tag <p>", "source": 'p("before")'}),
+        json.dumps({"id": 2, "exercise": "Line Break <br>", "source": "br()"}),
+        json.dumps({"id": 3, "exercise": "Paragraph Tag <p>", "source": 'p("after")'}),
+    ]
+    output = io.StringIO()
+    grade_submissions(submissions, output, workers=1)
+    verdicts = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [verdict["id"] for verdict in verdicts] == [1, 2, 3]
+    assert verdicts[1]["verdict"] == "error"
+    assert verdicts[1]["message"].startswith("The answer template can't be parsed: ")
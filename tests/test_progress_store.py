@@ -0,0 +1,49 @@
+import importlib
+import json
+
+from tests.fakes import FakeWindow
+
+
+class _FakeStorage:
+    def __init__(self) -> None:
+        self.items: dict[str, str] = {}
+
+    def getItem(self, key: str) -> str | None:  # noqa: N802
+        return self.items.get(key)
+
+    def setItem(self, key: str, value: str) -> None:  # noqa: N802
+        self.items[key] = value
+
+
+def test_early_flush_releases_timer_proxy(window: FakeWindow) -> None:
+    progress_store = importlib.import_module("progress_store")
+    proxy_registry = importlib.import_module("proxy_registry")
+    storage = _FakeStorage()
+    store = progress_store.ProgressStore(storage)
+    store.set_draft("Paragraph Tag <p>", 'p("a")')
+    store.mark_solved("Paragraph Tag <p>")
+    assert len(window.timers) == 1
+    assert proxy_registry.live_proxy_count() == 1
+
+    store.flush()
+
+    assert window.timers == {}
+    assert proxy_registry.live_proxy_count() == 0
+    stored = json.loads(storage.items[progress_store.STORAGE_KEY])
+    assert stored["drafts"] == {"Paragraph Tag <p>": 'p("a")'}
+    assert stored["solved"] == ["Paragraph Tag <p>"]
+
+
+def test_scheduled_write(window: FakeWindow) -> None:
+    progress_store = importlib.import_module("progress_store")
+    proxy_registry = importlib.import_module("proxy_registry")
+    storage = _FakeStorage()
+    store = progress_store.ProgressStore(storage)
+    store.set_attempts("Paragraph Tag <p>", 2)
+    [timer_id] = window.timers
+
+    window.fire(timer_id)
+
+    assert proxy_registry.live_proxy_count() == 0
+    assert json.loads(storage.items[progress_store.STORAGE_KEY])["attempts"] == {"Paragraph Tag <p>": 2}
+    assert progress_store.ProgressStore(storage).get_attempts("Paragraph Tag <p>") == 2
@@ -0,0 +1,38 @@
+import importlib
+
+from tests.fakes import FakeEventTarget, FakeWindow
+
+
+def test_closing_scope_destroys_all_proxies(window: FakeWindow) -> None:
+    proxy_registry = importlib.import_module("proxy_registry")
+    scope = proxy_registry.ProxyScope()
+    target = FakeEventTarget()
+    proxy = scope.proxy(lambda: None)
+    scope.add_event_listener(target, "click", lambda _event: None)
+    scope.add_event_listener(target, "toggle", lambda _event: None, capture=True)
+    scope.set_timeout(lambda: None, 100)
+    assert proxy_registry.live_proxy_count() == 4
+
+    scope.close()
+
+    assert proxy_registry.live_proxy_count() == 0
+    assert proxy.destroyed
+    assert target.listeners == []
+    assert window.timers == {}
+
+
+def test_timer_proxies_are_released(window: FakeWindow) -> None:
+    proxy_registry = importlib.import_module("proxy_registry")
+    scope = proxy_registry.ProxyScope()
+    calls = []
+    fired = scope.set_timeout(lambda: calls.append("fired"), 100)
+    cancelled = scope.set_timeout(lambda: calls.append("cancelled"), 100)
+    assert proxy_registry.live_proxy_count() == 2
+
+    window.fire(fired)
+    scope.clear_timeout(cancelled)
+
+    assert calls == ["fired"]
+    assert proxy_registry.live_proxy_count() == 0
+    scope.close()
+    assert proxy_registry.live_proxy_count() == 0
@@ -0,0 +1,137 @@
+import re
+from itertools import product
+
+import pytest
+from html_helpers import a, br, div, em, p
+from solution_validator import WILDCARD, AnswerTemplate, _TextPattern, validate_solution
+from virtual_dom import VNode
+
+
+def _strings(parts: tuple[str, ...], max_length: int) -> list[str]:
+    return ["".join(combination) for length in range(max_length + 1) for combination in product(parts, repeat=length)]
+
+
+@pytest.mark.parametrize(
+    ("template", "text", "matches"),
+    [
+        ("a.b", "a.b", True),
+        ("a.b", "axb", False),
+        ("(a)+", "(a)+", True),
+        ("(a)+", "aa", False),
+        ("1.{{*}}(+)", "1.x(+)", True),
+        ("1.{{*}}(+)", "1x(+)", False),
+        ("[{{*}}]*", "[a]*", True),
+        ("[{{*}}]*", "[a]", False),
+    ],
+)
+def test_regex_metacharacters_are_literal(template: str, text: str, *, matches: bool) -> None:
+    assert _TextPattern(template).matches(text) is matches
+
+
+@pytest.mark.parametrize(
+    ("template", "text", "matches"),
+    [
+        ("{{*}}", "", True),
+        ("{{*}}", "anything", True),
+        ("ab{{*}}ba", "aba", False),
+        ("ab{{*}}ba", "abba", True),
+        ("ab{{*}}ba", "abxba", True),
+        ("a{{*}}a", "a", False),
+        ("a{{*}}a", "aa", True),
+        ("{{*}}a{{*}}a{{*}}", "a", False),
+        ("{{*}}a{{*}}a{{*}}", "aa", True),
+        ("{{*}}a{{*}}a{{*}}", "xaxax", True),
+        ("a{{*}}b{{*}}c", "abc", True),
+        ("a{{*}}b{{*}}c", "acb", False),
+        ("a{{*}}b{{*}}c", "abbcbc", True),
+        ("a{{*}}bc{{*}}bc", "abcbc", True),
+        ("a{{*}}bc{{*}}bc", "abcb", False),
+        ("{{*}}{{*}}", "x", True),
+        ("a{{*}}{{*}}a", "a", False),
+    ],
+)
+def test_wildcards(template: str, text: str, *, matches: bool) -> None:
+    assert _TextPattern(template).matches(text) is matches
+
+
+@pytest.mark.parametrize(
+    ("template", "text"),
+    [("{{*}}", "a\nb"), ("a{{*}}b", "a\n\nb"), ("{{*}}\n{{*}}", "x\ny")],
+)
+def test_wildcards_match_line_breaks(template: str, text: str) -> None:
+    assert _TextPattern(template).matches(text)
+
+
+def test_template_without_wildcards_matches_only_itself() -> None:
+    pattern = _TextPattern("exact")
+    assert pattern.matches("exact")
+    assert not pattern.matches("exact ")
+    assert not pattern.matches("")
+
+
+def test_agrees_with_regex() -> None:
+    # The same as a regex in which the wildcards are `.*`, matching line breaks too, and everything else is literal
+    for template in _strings(("a", "b", WILDCARD), 4):
+        regex = re.compile(".*".join(re.escape(segment) for segment in template.split(WILDCARD)), re.DOTALL)
+        pattern = _TextPattern(template)
+        for text in _strings(("a", "b", "\n"), 4):
+            assert pattern.matches(text) is (regex.fullmatch(text) is not None), (template, text)
+
+
+@pytest.mark.parametrize(
+    ("expected", "actual", "message"),
+    [
+        ("<p>{{*}}</p>", div(em("x")), "❌ Expected a <p> tag, but got <em>"),
+        ('<a href="x">{{*}}</a>', div(a("t", href="y")), "❌ Attribute href is set to y, expected x"),
+        ('<a href="x">{{*}}</a>', div(a("t", href="x", id="i")), "❌ Unexpected attribute id"),
+        ('<a href="x">{{*}}</a>', div(a("t")), "❌ Missing attribute href"),
+        ("<p>a{{*}}</p>", div(p("b")), "❌ Text 'b' did not match the expected pattern 'a{{*}}'"),
+        ("<p>a</p>", div(p()), "❌ Missing text 'a'"),
+        ("<p><br/></p>", div(p("x", br())), "❌ Unexpected text 'x'"),
+        ("<p><br/>a</p>", div(p(br(), "b")), "❌ Text 'b' did not match the expected pattern 'a'"),
+        ("<p>{{*}}</p>", div(p("a"), p("b")), "❌ Unexpected <p> element"),
+        ("<p>{{*}}</p><p>{{*}}</p>", div(p("a")), "❌ Missing <p> element"),
+    ],
+)
+def test_failure_messages(expected: str, actual: VNode, message: str) -> None:
+    correct, result = validate_solution(expected, actual)
+    assert not correct
+    assert result.textContent == message
+
+
+def test_first_mismatch_in_document_order_is_reported() -> None:
+    # The text after the first child is only compared once the first child's descendants have matched
+    correct, result = validate_solution("<p><em>a</em>b<em>c</em></p>", div(p(em("x"), "y", em("z"))))
+    assert not correct
+    assert result.textContent == "❌ Text 'x' did not match the expected pattern 'a'"
+
+
+def test_matching_solution() -> None:
+    correct, result = validate_solution(
+        '<p>Hi {{*}}<a href="#">{{*}}</a></p>',
+        div(p("Hi there", a("link", href="#"))),
+    )
+    assert correct
+    assert result.textContent == "✅ Output matches"
+
+
+def _nested_divs(depth: int) -> VNode:
+    root = innermost = div()
+    for _ in range(depth - 1):
+        child = div()
+        innermost.append(child)
+        innermost = child
+    innermost.append("bottom")
+    return root
+
+
+def test_deep_tree() -> None:
+    depth = 20_000
+    # One level less in the template, since the output has the <div> that the template is wrapped in
+    expected = "<div>" * (depth - 1) + "{{*}}" + "</div>" * (depth - 1)
+    assert validate_solution(expected, _nested_divs(depth))[0]
+    correct, result = validate_solution(expected, _nested_divs(depth + 1))
+    assert not correct
+    assert result.textContent == "❌ Unexpected <div> element"
+    # Also when the template is loaded from the bundle's representation
+    assert AnswerTemplate(data=AnswerTemplate(expected).to_data()).match(_nested_divs(depth)) is None
@@ -0,0 +1,191 @@
+import json
+import re
+import shutil
+import subprocess
+from collections.abc import Callable
+from pathlib import Path
+from types import CodeType
+
+import pytest
+import user_code
+from virtual_dom import from_data, render
+
+type Compiler = Callable[[str], list[tuple[bool, CodeType]]]
+
+# The MicroPython Unix port, to run the corpus in the interpreter of the MicroPython worker. Skipped if not installed.
+MICROPYTHON: str | None = shutil.which("micropython")
+
+# Evaluates the programs of a JSON file like the worker does, with the repository root given as the first argument,
+# and prints the outcomes
+_MICROPYTHON_SCRIPT = """
+import json
+import sys
+
+sys.path.insert(0, sys.argv[1])
+import user_code
+from virtual_dom import to_data
+
+outcomes = []
+with open(sys.argv[2]) as f:
+    for source in json.load(f):
+        try:
+            outcomes.append(["output", to_data(user_code.evaluate_user_code(source))])
+        except SyntaxError:
+            outcomes.append(["SyntaxError"])
+        except Exception as err:
+            outcomes.append([type(err).__name__])
+print(json.dumps(outcomes))
+"""
+
+# Programs that both ways of compiling user code have to treat the same, including invalid ones
+CORPUS: list[str] = [
+    'div("a")',
+    'div("a"); p("b")',
+    'p("a");p("b");',
+    '"abc"',
+    '"a" "b"',
+    "q",
+    "p(q)",
+    "x == 1",
+    "lambda x=1: x",
+    '*[p("a")],',
+    '(y := p("w"))\ny',
+    'p(f"{1+1}={2}")',
+    'p("\\\\")',
+    "x = 1; div(str(x))",
+    "x = 1;",
+    "x = 1;;",
+    "x: int = 1\ndiv(str(x))",
+    "x:int",
+    'x = y = "q"\nx\ny',
+    "x = 1\nx += 1\np(str(x))",
+    'a, b = "1", "2"\np(a, b)',
+    'd = {"a": 1}\nd["a"] = 2\np(str(d))',
+    "x.y = 1",
+    "x = 1 if 2 else 3\np(str(x))",
+    "x = 1 # comment = 2\np(str(x))",
+    'x = "a;b"; p(x)',
+    'x = p("#"); x',
+    'p("a") # c = 1\n# x = 2\np("b")',
+    "x = [1,\n2]; p(str(x))",
+    "x = (\n# c\n1)\np(str(x))",
+    'div(\n "a",\n "b"\n)',
+    'a = """\n= x\n"""\np(a)',
+    "s = '''a\nb'''\np(s)",
+    "a = 'x' \\\n  + 'y'\np(a)",
+    "x=1\r\np(str(x))\r\n",
+    "f = lambda x=1: p(str(x))\nf()",
+    'def f(a="x"):\n    return p(a)\n\nf()\nf("y")',
+    "def f():\n    x = 1\n\n    return p(str(x))\nf()",
+    "@staticmethod\ndef f(): return 1\n",
+    'async def f(): pass\np("x")',
+    "class A:\n  x = 1\nA",
+    "@dec\nclass C: pass",
+    'for i in range(3):\n    div("x")\ndiv("y")',
+    'while False:\n    pass\nelse:\n    p("e")',
+    "if True:\n  a = 1\nelse:\n  a = 2\np(str(a))",
+    "if 1: x = 1\np(str(x))",
+    'try:\n  q = 1\nexcept Exception:\n  pass\nfinally:\n  pass\np("z")',
+    'match 1:\n  case 1:\n    pass\np("m")',
+    "match = 3\np(str(match))",
+    'with open("x") as f: pass',
+    'type X = int\np("t")',
+    'type = "5"\np(type)',
+    'import os\ndiv("x")',
+    "del x",
+    "global x\nx = 1\np(str(x))",
+    'assert 1 == 1\np("k")',
+    'raise ValueError("x")',
+    "\n\n\n1/0",
+    # Valid syntax that's only rejected by the compiler because of where it is
+    "return 1",
+    "return",
+    "x = 1\nreturn x",
+    'return p("r"); p("s")',
+    "break",
+    "if True:\n    continue",
+    "async for x in y:\n    pass",
+    "yield 1",
+    "x = yield 2",
+    "await x",
+    'yield 1\np("a"',
+    # Invalid syntax
+    'div("a"',
+    "x = = 1",
+    '  div("x")',
+    'div("x")\n  p("y")',
+    "1 +",
+    "for x in: pass",
+    "x := 1",
+    "def f(:\n    pass",
+]
+
+# Programs in the corpus with syntax that MicroPython doesn't support
+MICROPYTHON_SYNTAX_ERRORS: frozenset[str] = frozenset({'*[p("a")],', 'match 1:\n  case 1:\n    pass\np("m")'})
+
+
+def _without_addresses(text: str) -> str:
+    """Remove the memory addresses from the representations of objects."""
+    return re.sub(r" at 0x[0-9a-f]+", "", text)
+
+
+def _outcome(compile_user_code: Compiler, source: str) -> tuple[object, ...]:
+    try:
+        return ("output", render(user_code.run_user_code(compile_user_code(source))))
+    except SyntaxError as err:
+        return (type(err).__name__, err.msg, err.lineno, err.filename)
+    except Exception as err:
+        return (type(err).__name__, _without_addresses(str(err)))
+
+
+@pytest.mark.parametrize("source", CORPUS)
+def test_scanner_agrees_with_ast(source: str) -> None:
+    assert _outcome(user_code._compile_with_scanner, source) == _outcome(user_code._compile_with_ast, source)
+
+
+def test_scanner_rejects_nonlocal_at_module_level() -> None:
+    # A known difference: it's valid syntax for `ast.parse`, but the scanner can't tell it apart from invalid syntax
+    assert _outcome(user_code._compile_with_ast, "nonlocal x") == ("output", "<div></div>")
+    with pytest.raises(SyntaxError):
+        user_code._compile_with_scanner("nonlocal x")
+
+
+def test_evaluate_user_code() -> None:
+    output = user_code.evaluate_user_code('def item(text):\n    return li(text)\n\nul(item("a"), item("b"))')
+    assert render(output) == "<div><ul><li>a</li><li>b</li></ul></div>"
+
+
+def test_definitions_do_not_leak_between_runs() -> None:
+    user_code.evaluate_user_code('x = p("a")')
+    with pytest.raises(NameError):
+        user_code.evaluate_user_code("x")
+
+
+def _micropython_outcome(source: str) -> list[str]:
+    """Get the outcome of a program in CPython, without the error messages, which MicroPython words differently."""
+    try:
+        return ["output", _without_addresses(render(user_code.evaluate_user_code(source)))]
+    except SyntaxError:
+        return ["SyntaxError"]
+    except Exception as err:
+        return [type(err).__name__]
+
+
+@pytest.mark.skipif(MICROPYTHON is None, reason="needs the micropython executable")
+def test_micropython_agrees_with_cpython(tmp_path: Path) -> None:
+    script = tmp_path / "evaluate.py"
+    script.write_text(_MICROPYTHON_SCRIPT, encoding="utf-8")
+    corpus = tmp_path / "corpus.json"
+    corpus.write_text(json.dumps(CORPUS), encoding="utf-8")
+    repository = Path(user_code.__file__).parent
+    result = subprocess.run(  # noqa: S603
+        [MICROPYTHON, str(script), str(repository), str(corpus)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for source, outcome in zip(CORPUS, json.loads(result.stdout), strict=True):
+        if outcome[0] == "output":
+            outcome[1] = _without_addresses(render(from_data(outcome[1])))
+        expected = ["SyntaxError"] if source in MICROPYTHON_SYNTAX_ERRORS else _micropython_outcome(source)
+        assert outcome == expected, source
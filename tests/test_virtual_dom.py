@@ -0,0 +1,32 @@
+import json
+
+from virtual_dom import VNode, from_data, render, to_data
+
+
+def _element(tag_name: str, *children: VNode | str, **attributes: str) -> VNode:
+    node = VNode(tag_name)
+    node.attributes = attributes
+    node.append(*children)
+    return node
+
+
+def test_data_round_trip() -> None:
+    tree = _element("div", _element("p", "a <b>", _element("br")), "text", _element("a", "link", href="#/"), id="x")
+    data = json.loads(json.dumps(to_data(tree)))
+    assert render(from_data(data)) == render(tree)
+
+
+def test_text_round_trip() -> None:
+    assert from_data(to_data("just text")) == "just text"
+
+
+def test_deep_tree_round_trip() -> None:
+    depth = 100_000
+    tree = innermost = _element("div")
+    for _ in range(depth - 1):
+        child = _element("div")
+        innermost.append(child)
+        innermost = child
+    innermost.append("bottom")
+    data = json.loads(json.dumps(to_data(tree)))
+    assert render(from_data(data)) == "<div>" * depth + "bottom" + "</div>" * depth
@@ -0,0 +1,385 @@
+"""Running the code that users enter as solutions to the exercises.
+
+The code is compiled with the help of the `ast` module wherever it's available. MicroPython doesn't have it, so in a
+MicroPython worker the code is instead split into its top-level statements by a small scanner, and each statement is
+compiled on its own: expressions in "eval" mode, so their values can be collected, everything else in "exec" mode. The
+scanner is only a fallback: it reports a few invalid programs differently from `ast` (see `tests/test_user_code.py`),
+and MicroPython words its syntax errors differently and lacks some syntax, like `match` statements.
+"""
+
+from collections import OrderedDict
+
+import html_helpers
+from html_helpers import _virtual_nodes, div
+from virtual_dom import VNode
+
+try:
+    from collections.abc import Callable
+    from types import CodeType
+    from typing import Final
+except ImportError:
+    # MicroPython has none of these modules. It ignores annotations, so they're only needed by type checkers.
+    pass
+
+try:
+    import ast
+except ImportError:
+    # MicroPython, see the module's docstring
+    ast = None
+
+# How many compiled submissions are kept around. Users mostly resubmit (or live-preview) the same few versions of
+# their code, so this doesn't need to be large.
+COMPILED_CODE_CACHE_SIZE: Final[int] = 32
+
+# The name under which the function collecting the values of expression statements is made available to the compiled
+# code. It's not a valid name for users to pick by accident.
+_COLLECT: Final[str] = "__collect_output__"
+
+# The file name in syntax error messages of the scanner, the same one `ast.parse` uses
+_FILENAME: Final[str] = "<unknown>"
+
+# Statements starting with these keywords have a body. Soft keywords like `match` are recognized by the trailing colon.
+_COMPOUND_KEYWORDS: Final[frozenset[str]] = frozenset({"async", "class", "def", "for", "if", "try", "while", "with"})
+# Clauses that continue the compound statement before them at the same indentation
+_CONTINUATION_KEYWORDS: Final[frozenset[str]] = frozenset({"elif", "else", "except", "finally"})
+# The characters before a "=" that make it part of a comparison or an augmented assignment
+_OPERATOR_CHARACTERS: Final[str] = "=!<>:+-*/%&|^@"
+# Statements that don't compile on their own are compiled in these blocks to find out whether they're only invalid
+# because of where they are, like a `return` outside of a function
+_ENCLOSING_BLOCKS: Final[tuple[str, ...]] = ("def _():\n while _:\n", "async def _():\n while _:\n")
+
+# The helpers that user code has access to. Every run gets its own copy, so definitions don't leak between runs.
+_HELPERS: Final[dict[str, object]] = {
+    name: value for name, value in html_helpers.__dict__.items() if not name.startswith("_")
+}
+
+# Source code -> its compiled statements, least recently used first. Each statement comes with a flag that says
+# whether it's an expression whose value is collected. Code compiled with `ast` is a single statement, which collects
+# the values of its expressions itself. An `OrderedDict`, because MicroPython's dicts don't keep their order.
+_compiled_code: OrderedDict[str, list[tuple[bool, CodeType]]] = OrderedDict()
+
+
+def evaluate_user_code(source: str) -> VNode:
+    """Run the user's code and collect the HTML produced by its top-level expressions into a <div>.
+
+    Function definitions and assignments are executed so they can be used by later expressions. Any expression that
+    doesn't produce an HTML element or a string is an error.
+    """
+    return run_user_code(compile_user_code(source))
+
+
+def compile_user_code(source: str) -> list[tuple[bool, CodeType]]:
+    """Compile the user's code, raising a `SyntaxError` if any part of it is invalid.
+
+    Only top-level expressions, function definitions and assignments are kept, all other statements are dropped.
+    """
+    code = _compiled_code.pop(source, None)
+    if code is None:
+        code = _compile_with_ast(source) if ast is not None else _compile_with_scanner(source)
+        if len(_compiled_code) >= COMPILED_CODE_CACHE_SIZE:
+            del _compiled_code[next(iter(_compiled_code))]
+    _compiled_code[source] = code
+    return code
+
+
+def run_user_code(code: list[tuple[bool, CodeType]]) -> VNode:
+    """Run compiled user code, see `evaluate_user_code`."""
+    with _virtual_nodes():
+        output = div()
+        environment = _HELPERS.copy()
+        collect = _output_collector(output)
+        environment[_COLLECT] = collect
+        for is_expression, statement in code:
+            if is_expression:
+                collect(eval(statement, environment))
+            else:
+                exec(statement, environment)
+    return output
+
+
+def _output_collector(output: VNode) -> Callable[[object], None]:
+    """Create the function that appends the values of expression statements to the output."""
+
+    def collect(result: object) -> None:
+        # Not `VNode | str`, which MicroPython doesn't support
+        if isinstance(result, (VNode, str)):
+            output.append(result)
+        else:
+            err = f"""
+            Expression returned {result} (of type {type(result)}), instead of an HTML element or string
+            """.strip()
+            raise ValueError(err)  # noqa: TRY004
+
+    return collect
+
+
+def _compile_with_ast(source: str) -> list[tuple[bool, CodeType]]:
+    """Compile the user's code into a single code object.
+
+    Every top-level expression statement is turned into a call that hands its value to the collect function.
+    Function definitions and assignments are kept as they are and all other statements are dropped.
+    """
+    tree = ast.parse(source)
+    body: list[ast.stmt] = []
+    # Not a `match` statement, which MicroPython can't parse even though it never runs this function
+    for statement in tree.body:
+        if isinstance(statement, ast.Expr):
+            call = ast.Call(func=ast.Name(id=_COLLECT, ctx=ast.Load()), args=[statement.value], keywords=[])
+            body.append(ast.copy_location(ast.Expr(value=ast.copy_location(call, statement)), statement))
+        elif isinstance(statement, (ast.FunctionDef, ast.Assign)):
+            body.append(statement)
+    module = ast.fix_missing_locations(ast.Module(body=body, type_ignores=[]))
+    return [(False, compile(module, "", mode="exec"))]
+
+
+class _LogicalLine:
+    """A statement's line, which may span several physical lines, and where its top-level `;`, `=` and `:` are."""
+
+    __slots__ = ("end", "indented", "line_number", "operators", "start")
+
+    def __init__(self, start: int, line_number: int, *, indented: bool) -> None:
+        self.start = start
+        self.end = start
+        # The number of physical lines before this one
+        self.line_number = line_number
+        self.indented = indented
+        # (offset, character) of the `;`, `=` and `:` outside of brackets, strings and comments
+        self.operators: list[tuple[int, str]] = []
+
+
+def _logical_lines(source: str) -> list[_LogicalLine]:
+    """Split the code into logical lines, skipping blank lines and comments.
+
+    Like in Python's tokenizer, a logical line continues across line breaks inside brackets and triple-quoted strings
+    and after a backslash. Invalid code is split on a best-effort basis. Compiling it reports the error.
+    """
+    lines: list[_LogicalLine] = []
+    position = 0
+    line_number = 0
+    while position < len(source):
+        indentation_end = position
+        while indentation_end < len(source) and source[indentation_end] in " \t\f":
+            indentation_end += 1
+        line = _LogicalLine(position, line_number, indented=indentation_end > position)
+        has_code, line_number = _scan_line(source, line, indentation_end)
+        position = line.end
+        if has_code:
+            lines.append(line)
+    return lines
+
+
+def _scan_line(source: str, line: _LogicalLine, position: int) -> tuple[bool, int]:
+    """Find the end and the operators of a logical line, starting after its indentation.
+
+    Returns whether the line contains any code and the number of the physical line after it.
+    """
+    line_number = line.line_number
+    depth = 0
+    has_code = False
+    while position < len(source):
+        character = source[position]
+        if character == "\n":
+            position += 1
+            line_number += 1
+            if depth == 0:
+                break
+        elif character == "#":
+            comment_end = source.find("\n", position)
+            position = len(source) if comment_end == -1 else comment_end
+        elif character == "\\" and source[position + 1 : position + 3].lstrip("\r").startswith("\n"):
+            position = source.index("\n", position) + 1
+            line_number += 1
+        elif character in "\"'":
+            has_code = True
+            position, line_number = _skip_string(source, position, line_number)
+        else:
+            if character in "([{":
+                depth += 1
+            elif character in ")]}":
+                depth = max(0, depth - 1)
+            elif depth == 0 and character in ";=:" and _is_operator(source, position):
+                line.operators.append((position, character))
+            has_code = has_code or not character.isspace()
+            position += 1
+    line.end = position
+    return has_code, line_number
+
+
+def _skip_string(source: str, position: int, line_number: int) -> tuple[int, int]:
+    """Skip the string literal starting at the position, returning the position and line number after it."""
+    quote = source[position] * 3 if source.startswith(source[position] * 3, position) else source[position]
+    position += len(quote)
+    while position < len(source):
+        if source.startswith(quote, position):
+            return position + len(quote), line_number
+        character = source[position]
+        if character == "\n":
+            if len(quote) == 1:
+                # An unterminated string, which ends at the line break
+                return position, line_number
+            line_number += 1
+        elif character == "\\":
+            if source.startswith("\n", position + 1):
+                line_number += 1
+            position += 1
+        position += 1
+    return position, line_number
+
+
+def _is_operator(source: str, position: int) -> bool:
+    """Whether the `;`, `=` or `:` at the position is on its own, rather than part of `==`, `+=`, `:=` etc."""
+    character = source[position]
+    following = source[position + 1 : position + 2]
+    if character == ":":
+        return following != "="
+    if character == "=":
+        return following != "=" and (position == 0 or source[position - 1] not in _OPERATOR_CHARACTERS)
+    return True
+
+
+def _first_word(source: str, line: _LogicalLine) -> str:
+    position = line.start
+    while source[position] in " \t\f":
+        position += 1
+    end = position
+    while end < line.end and (source[end].isalpha() or source[end].isdigit() or source[end] == "_"):
+        end += 1
+    return source[position:end] if end > position else source[position]
+
+
+def _is_compound(source: str, line: _LogicalLine) -> bool:
+    """Whether the line is the first line of a compound statement or a decorator."""
+    first_word = _first_word(source, line)
+    if first_word in _COMPOUND_KEYWORDS or first_word == "@":
+        return True
+    # A `match` statement, or anything else that ends in a colon, which no simple statement does
+    if not line.operators or line.operators[-1][1] != ":":
+        return False
+    rest = source[line.operators[-1][0] + 1 : line.end].strip()
+    return not rest or rest.startswith("#")
+
+
+def _statements(source: str) -> list[list[_LogicalLine]]:
+    """Group the logical lines into top-level statements."""
+    statements: list[list[_LogicalLine]] = []
+    for line in _logical_lines(source):
+        continues_statement = statements and (
+            line.indented
+            or _first_word(source, line) in _CONTINUATION_KEYWORDS
+            or (not statements[-1][-1].indented and _first_word(source, statements[-1][-1]) == "@")
+        )
+        if continues_statement:
+            statements[-1].append(line)
+        else:
+            statements.append([line])
+    return statements
+
+
+def _part(source: str, start: int, end: int, line_number: int) -> str:
+    """Get part of the code, preceded by line breaks so that it has the same line numbers as in the whole code."""
+    return "\n" * line_number + source[start:end]
+
+
+def _compiles(code: str) -> bool:
+    try:
+        compile(code, _FILENAME, "exec")
+    except SyntaxError:
+        return False
+    return True
+
+
+def _is_valid_in_function(statement: str) -> bool:
+    """Whether the statement can be compiled inside of a function and a loop."""
+    body = "  " + statement.replace("\n", "\n  ")
+    return any(_compiles(block + body) for block in _ENCLOSING_BLOCKS)
+
+
+def _compile_statement(part: str) -> CodeType | None:
+    """Compile a statement, or return None if it's valid syntax that's only rejected because of where it is.
+
+    Like `ast.parse`, this accepts a `return` outside of a function, a `break` outside of a loop and so on. The `ast`
+    version drops most such statements and reports the others only once the whole code has been parsed.
+    """
+    try:
+        return compile(part, _FILENAME, "exec")
+    except SyntaxError as err:
+        if isinstance(err, IndentationError) or not _is_valid_in_function(part):
+            raise
+    return None
+
+
+def _compile_with_scanner(source: str) -> list[tuple[bool, CodeType]]:
+    """Compile the user's code statement by statement, for interpreters without `ast`."""
+    compiled: list[tuple[bool, CodeType]] = []
+    # The statements that are kept but were only accepted by `_compile_statement`
+    misplaced_statements: list[str] = []
+    for lines in _statements(source):
+        first, last = lines[0], lines[-1]
+        if _is_compound(source, first):
+            part = _part(source, first.start, last.end, first.line_number)
+            # Compiled even if it's dropped, to report syntax errors
+            statement = _compile_statement(part)
+            definition = next((line for line in lines if _first_word(source, line) != "@"), first)
+            if _first_word(source, definition) != "def":
+                continue
+            if statement is None:
+                misplaced_statements.append(part)
+            else:
+                compiled.append((False, statement))
+            continue
+        # A simple statement, or several of them separated by semicolons
+        separators = [offset for offset, character in first.operators if character == ";"]
+        if len(lines) > 1 or separators or first.indented:
+            # Reports misplaced indentation and empty statements between semicolons
+            _compile_statement(_part(source, first.start, last.end, first.line_number))
+        starts = [first.start] + [separator + 1 for separator in separators]
+        # Not `[*separators, first.end]`, which MicroPython can't parse
+        ends = separators + [first.end]  # noqa: RUF005
+        for index, start in enumerate(starts):
+            compiled_part = _compile_simple_statement(source, first, start, ends[index], misplaced_statements)
+            if compiled_part is not None:
+                compiled.append(compiled_part)
+    if misplaced_statements:
+        # Raises the error, with the file name that the `ast` version compiles the code with
+        compile(misplaced_statements[0], "", "exec")
+    return compiled
+
+
+def _compile_simple_statement(
+    source: str,
+    line: _LogicalLine,
+    start: int,
+    end: int,
+    misplaced_statements: list[str],
+) -> tuple[bool, CodeType] | None:
+    """Compile an expression or assignment, or return None for any other kind of simple statement.
+
+    A kept statement that's only valid syntax inside of a function is added to the misplaced statements instead.
+    """
+    while start < end and source[start] in " \t\f":
+        start += 1
+    text = source[start:end].strip()
+    if not text or text.startswith("#"):
+        return None
+    line_number = line.line_number + source.count("\n", line.start, start)
+    part = _part(source, start, end, line_number)
+    # Compiled even if it's dropped, to report syntax errors. Some expressions are only valid in parentheses, like
+    # `x := 1`, so this also checks that the statement is valid on its own before it's compiled as an expression.
+    statement = _compile_statement(part)
+    operators = [character for offset, character in line.operators if start <= offset < end]
+    # The first `=` is an assignment, unless the statement is annotated (`x: int = 1`) or a type alias
+    words = text.split(None, 2)
+    is_type_alias = words[0] == "type" and len(words) > 1 and (words[1][0].isalpha() or words[1][0] == "_")
+    is_assignment = "=" in operators and ":" not in operators[: operators.index("=")] and not is_type_alias
+    if statement is None:
+        # An expression like `yield x` is kept, while `return x` isn't
+        if is_assignment or _is_valid_in_function("(" + text + "\n)"):
+            misplaced_statements.append(part)
+        return None
+    # In parentheses, because MicroPython doesn't allow line breaks before an expression in "eval" mode, and tuples
+    # with unpacked items, like `*items,`, can't be compiled in "eval" mode otherwise
+    try:
+        return True, compile("(" + _part(source, start, end, line_number) + "\n)", _FILENAME, "eval")
+    except SyntaxError:
+        pass
+    return (False, statement) if is_assignment else None
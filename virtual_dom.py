@@ -0,0 +1,156 @@
+"""A lightweight, pure-Python representation of HTML elements.
+
+Building elements through `document.createElement` crosses the Pyodide FFI for every element, attribute and child.
+A `VNode` tree is built entirely in Python instead and is turned into HTML in a single pass, so it can be attached to
+the page with one `insertAdjacentHTML` call.
+"""
+
+try:  # noqa: SIM105
+    from typing import Final
+except ImportError:
+    # MicroPython, which runs this module in the code runner worker, has neither typing nor contextlib. It ignores
+    # annotations, so `Final` is only needed by type checkers.
+    pass
+
+# Elements that can't have any contents and therefore don't get a closing tag
+VOID_ELEMENTS: Final[frozenset[str]] = frozenset(
+    {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"},
+)
+
+# DOM node types, see https://developer.mozilla.org/en-US/docs/Web/API/Node/nodeType
+ELEMENT_NODE: Final[int] = 1
+TEXT_NODE: Final[int] = 3
+
+# Elements whose text contents are not escaped when serialized
+RAW_TEXT_ELEMENTS: Final[frozenset[str]] = frozenset({"script", "style"})
+
+
+# The escaping uses `str.replace` rather than `str.translate`, which MicroPython doesn't have. `&` has to come first.
+def escape_text(text: str) -> str:
+    """Escape text the same way the browser does when serializing a text node."""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace("\xa0", "&nbsp;")
+
+
+def escape_attribute(value: str) -> str:
+    """Escape an attribute value the same way the browser does when serializing an element."""
+    return value.replace("&", "&amp;").replace('"', "&quot;").replace("\xa0", "&nbsp;")
+
+
+class VNode:
+    """An HTML element that only exists in Python.
+
+    The methods and properties mirror the subset of the DOM API that we use on elements, so a `VNode` can be used
+    wherever we'd otherwise pass around an element created with `document.createElement`.
+    """
+
+    __slots__ = ("attributes", "children", "tag_name")
+
+    def __init__(self, tag_name: str) -> None:
+        self.tag_name: str = tag_name.lower()
+        self.attributes: dict[str, str] = {}
+        self.children: list[VNode | str] = []
+
+    def __repr__(self) -> str:
+        return f"VNode({self.outerHTML!r})"
+
+    def setAttribute(self, name: str, value: object) -> None:  # noqa: N802
+        """Set an attribute. Like in the DOM, attribute names are case-insensitive."""
+        self.attributes[name.lower()] = str(value)
+
+    def getAttribute(self, name: str) -> str | None:  # noqa: N802
+        """Get the value of an attribute or None if it isn't set."""
+        return self.attributes.get(name.lower())
+
+    def append(self, *children: "VNode | str") -> None:
+        """Append children to the end of this element."""
+        for child in children:
+            self.children.append(child if isinstance(child, VNode) else str(child))
+
+    @property
+    def outerHTML(self) -> str:  # noqa: N802
+        """The HTML of this element including the element itself."""
+        return render(self)
+
+    @property
+    def innerHTML(self) -> str:  # noqa: N802
+        """The HTML of the children of this element."""
+        return render(*self.children)
+
+    @property
+    def textContent(self) -> str:  # noqa: N802
+        """The text of this element and all its descendants, without any markup."""
+        texts: list[str] = []
+        stack: list[VNode | str] = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                texts.append(node)
+            else:
+                stack.extend(reversed(node.children))
+        return "".join(texts)
+
+
+def _start_tag(node: VNode) -> str:
+    attributes = "".join(f' {name}="{escape_attribute(value)}"' for name, value in node.attributes.items())
+    return f"<{node.tag_name}{attributes}>"
+
+
+def render(*nodes: VNode | str) -> str:
+    """Serialize the given nodes to an HTML string.
+
+    The tree is walked with an explicit stack instead of recursion, so arbitrarily deep trees can be serialized.
+    """
+    parts: list[str] = []
+    # Strings on the stack are either text nodes or closing tags. The flag says whether they go into the output as-is
+    # (closing tags and the contents of raw text elements) or need to be escaped first.
+    stack: list[tuple[VNode | str, bool]] = [(node, False) for node in reversed(nodes)]
+    while stack:
+        node, raw = stack.pop()
+        if isinstance(node, str):
+            parts.append(node if raw else escape_text(node))
+            continue
+        parts.append(_start_tag(node))
+        if node.tag_name in VOID_ELEMENTS:
+            continue
+        stack.append((f"</{node.tag_name}>", True))
+        raw_children = node.tag_name in RAW_TEXT_ELEMENTS
+        stack.extend((child, raw_children) for child in reversed(node.children))
+    return "".join(parts)
+
+
+def mount(parent: object, *nodes: VNode | str) -> None:
+    """Append the given nodes to a DOM element using a single call into the browser."""
+    parent.insertAdjacentHTML("beforeend", render(*nodes))
+
+
+# `to_data` and `from_data` use a JSON-compatible representation of a node: the list of its nodes in document order,
+# where a text is just the string and an element is [tag name, attributes, number of children]. Being flat, it can be
+# walked without recursion and turned into JSON no matter how deep the tree is.
+def to_data(node: VNode | str) -> list[str | list]:
+    """Convert a node to plain lists, dicts and strings, e.g. to send it to another thread as JSON."""
+    data: list[str | list] = []
+    stack: list[VNode | str] = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            data.append(node)
+        else:
+            data.append([node.tag_name, node.attributes, len(node.children)])
+            stack.extend(reversed(node.children))
+    return data
+
+
+def from_data(data: list[str | list]) -> VNode | str:
+    """Recreate a node from the representation created by `to_data`."""
+    # Going backwards, the children of an element are complete when it's reached, with the first one on top
+    stack: list[VNode | str] = []
+    for item in reversed(data):
+        if isinstance(item, str):
+            stack.append(item)
+            continue
+        tag_name, attributes, child_count = item
+        node = VNode(tag_name)
+        node.attributes = attributes
+        node.children = [stack.pop() for _ in range(child_count)]
+        stack.append(node)
+    return stack[0]
@@ -0,0 +1,74 @@
+"""Lists that only render the rows that are currently scrolled into view.
+
+The list sits in a scrollable viewport of a fixed height, inside a spacer that's as tall as all rows together, so
+the scrollbar behaves as if every row was there. Whenever the list is scrolled, the rows in view (plus a few above
+and below, so scrolling doesn't show gaps) are rendered and moved to where they'd be in the full list. All rows need
+to have the same height for this to work.
+"""
+
+from collections.abc import Callable
+from typing import Final
+
+from html_helpers import _virtual_nodes, div, ul
+from proxy_registry import ProxyScope
+from pyscript.web import Element
+from virtual_dom import VNode, render
+
+ROW_HEIGHT_PX: Final[int] = 32
+# The height of the viewport, in rows
+VISIBLE_ROWS: Final[int] = 15
+# How many rows are rendered beyond each edge of the viewport
+OVERSCAN_ROWS: Final[int] = 10
+
+
+def windowed_list_viewport(row_count: int, **attributes: str) -> VNode:
+    """Create the empty viewport for a windowed list. Attach a `WindowedList` to it once it has been mounted."""
+    return div(
+        div(
+            ul(style="list-style-type: none; margin: 0; padding: 0; position: absolute; width: 100%;"),
+            style=f"height: {row_count * ROW_HEIGHT_PX}px; position: relative;",
+        ),
+        style=f"height: {min(row_count, VISIBLE_ROWS) * ROW_HEIGHT_PX}px; overflow-y: auto;",
+        **attributes,
+    )
+
+
+class WindowedList:
+    """Renders the visible rows of a mounted windowed list viewport."""
+
+    __slots__ = ("_rendered_range", "_rows", "_viewport", "render_row", "row_count")
+
+    def __init__(
+        self,
+        viewport: Element,
+        row_count: int,
+        render_row: Callable[[int], VNode],
+        proxies: ProxyScope,
+    ) -> None:
+        self._viewport = viewport
+        self._rows = viewport.querySelector("ul")
+        self.row_count = row_count
+        # Creates the row with the given index. It's called inside `_virtual_nodes` and must be `ROW_HEIGHT_PX` high.
+        self.render_row = render_row
+        self._rendered_range: range | None = None
+        # The scroll listener is removed when the scope that owns the list's proxies is closed
+        proxies.add_event_listener(viewport, "scroll", self._update)
+        self._update()
+
+    def scroll_to(self, index: int) -> None:
+        """Scroll the row with the given index into the middle of the viewport."""
+        self._viewport.scrollTop = max(0, (index - VISIBLE_ROWS // 2) * ROW_HEIGHT_PX)
+        self._update()
+
+    def _update(self, *_args: object) -> None:
+        rendered_count = min(self.row_count, VISIBLE_ROWS + 2 * OVERSCAN_ROWS)
+        first = int(self._viewport.scrollTop) // ROW_HEIGHT_PX - OVERSCAN_ROWS
+        first = max(0, min(first, self.row_count - rendered_count))
+        rows = range(first, first + rendered_count)
+        if rows == self._rendered_range:
+            return
+        self._rendered_range = rows
+        with _virtual_nodes():
+            rendered = [self.render_row(index) for index in rows]
+        self._rows.style.top = f"{first * ROW_HEIGHT_PX}px"
+        self._rows.innerHTML = render(*rendered)